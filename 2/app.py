@@ -1,6 +1,11 @@
 from flask import Flask #flask는 웹서버 만들기 위한 파이썬 라이브러리 , Flask는 그중에 웹서버 생성틀
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1])) #저장소 루트의 common 패키지를 쓰기 위해 경로 추가
+from common.flask_metrics import install_metrics #라우트별 요청수/지연시간/응답크기 계측
 
 app = Flask(__name__) #app는 변수 Flask(__name__)은 웹서버 만드는 명령어, __name__은 실행중인 파일 이름
+metrics = install_metrics(app) #GET /metrics 로 Prometheus 형식 노출
 
 @app.route("/") #의문. 왜 "/" 가 루트로 정해질수있는가. #웹에서 주소입력시 함수 실행 
 def hello_world(): #위 실행시에 호출함수는 hello_world이다.
@@ -1,3 +1,94 @@
+from decimal import Decimal, localcontext
+from fractions import Fraction
+
+
+def loop_power(n, e):
+    result = 1
+    for i in range(e):
+        result *= n
+    return result
+
+
+def fast_power(n, e):
+    # 제곱을 반복하며 지수의 비트를 보는 방식(exponentiation by squaring): 곱셈 O(log e)번
+    # int 밑수는 큰 정수 그대로 정확하게, 음수 지수는 int면 Fraction, 그 외는 1/결과
+    if e < 0:
+        if n == 0:
+            raise ZeroDivisionError("0 cannot be raised to a negative power")
+        positive = fast_power(n, -e)
+        return Fraction(1, positive) if isinstance(positive, int) else 1 / positive
+    result = 1
+    base = n
+    while e:
+        if e & 1:
+            result *= base
+        e >>= 1
+        if e:
+            base *= base
+    return result
+
+
+def decimal_power(n, e, prec=50):
+    # Decimal로 유효숫자 prec자리까지 계산 (float 반올림 오차 없이)
+    with localcontext() as ctx:
+        ctx.prec = prec + 5
+        result = fast_power(Decimal(n), e)
+        ctx.prec = prec
+        return +result
+
+
+def mod_power(n, e, m):
+    # (n ** e) % m, 중간값이 m을 넘지 않게 매 단계 나머지. 음수 지수는 모듈러 역원 사용
+    if m == 1:
+        return 0
+    n %= m
+    if e < 0:
+        n = pow(n, -1, m)
+        e = -e
+    result = 1
+    while e:
+        if e & 1:
+            result = result * n % m
+        e >>= 1
+        if e:
+            n = n * n % m
+    return result
+
+
+def batch_power(bases, exponents):
+    # NumPy 배열 일괄 계산: 최대 지수의 비트 수만큼만 반복 (원소별 O(log e))
+    # 반환 (결과 배열, 오류 bool 배열): fast_power가 ZeroDivisionError를 내는 0 ** 음수는 결과 NaN, 오류 True
+    import numpy as np
+    bases, exponents = np.broadcast_arrays(np.asarray(bases, dtype=float), np.asarray(exponents, dtype=np.int64))
+    result = np.ones(bases.shape)
+    base = bases.copy()
+    e = np.abs(exponents)
+    with np.errstate(over='ignore', divide='ignore', invalid='ignore'):
+        while e.any():
+            odd = (e & 1).astype(bool)
+            result[odd] *= base[odd]
+            e = e >> 1
+            base *= base
+        errors = (exponents < 0) & (bases == 0)
+        result = np.where(exponents < 0, 1.0 / np.where(errors, 1.0, result), result)
+    return np.where(errors, np.nan, result), errors
+
+
+def benchmark(n=1.0000001, max_digits=7):
+    import time
+    print(f"{'exponent':>10} | {'loop (s)':>10} | {'fast (s)':>10} | speedup")
+    for d in range(1, max_digits + 1):
+        e = 10 ** d
+        t0 = time.perf_counter()
+        slow = loop_power(n, e)
+        t1 = time.perf_counter()
+        fast = fast_power(n, e)
+        t2 = time.perf_counter()
+        if abs(slow - fast) > 1e-9 * abs(slow): # assert는 python -O에서 빠지므로 직접 확인
+            raise RuntimeError(f"fast_power 결과가 다릅니다: {n} ** {e} → {fast} (loop {slow})")
+        print(f"{e:>10} | {t1 - t0:>10.6f} | {t2 - t1:>10.6f} | {(t1 - t0) / max(t2 - t1, 1e-9):,.0f}x")
+
+
 def power_calculator():
     try:
         n_i = input("숫자를 입력하세요:")
@@ -5,23 +96,26 @@ def power_calculator():
     except ValueError:
         print("Invaild number input")
         return
-    
+
     try:
         e_i = input("지수를 입력하세요:")
         e = int(e_i)
-        if e < 0:
-            print("Invaild exponet input")
-            return
     except ValueError:
         print("Invaild exponet input")
         return
-    
-    result = 1
-    for i in range(e):
-        result *= n
+
+    try:
+        result = fast_power(n, e)
+    except ZeroDivisionError:
+        print("Invaild exponet input")
+        return
 
 
     print("Result =",result)
 
 if __name__ == "__main__":
-    power_calculator()
\ No newline at end of file
+    import sys
+    if "--bench" in sys.argv:
+        benchmark()
+    else:
+        power_calculator()
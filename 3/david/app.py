@@ -1,10 +1,22 @@
 from flask import Flask, request, Response # flask 에서 Flask, request(요청정보) , Response(반응)
 import os #윤영체제 관련기능
-from io import BytesIO #메모리에 데이터를 저장하는 기능을 사용
-from gtts import gTTS # gtts에서 gTTS 문자를 음성으로 바꿔주는 기능
+import sys
+from pathlib import Path
+from tts_cache import AudioCache, BACKENDS, cache_key # 음성 캐시(메모리 LRU + 디스크)와 합성 백엔드 목록
+sys.path.insert(0, str(Path(__file__).resolve().parents[2])) #저장소 루트의 common 패키지를 쓰기 위해 경로 추가
+from common.flask_metrics import install_metrics #라우트별 요청수/지연시간/응답크기 계측
 
 DEFAULT_LANG = os.getenv('DEFAULT_LANG', 'ko') #운영체제에게 물어봐서 기본 언어설정을 가져오고 없다면 ko 한국어로 가져오라는 문장
+TTS_BACKEND = os.getenv('TTS_BACKEND', 'gtts') #합성 백엔드 선택 gtts(기본) 또는 stub(테스트용 로컬)
+TTS_CACHE_DIR = os.getenv('TTS_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tts_cache')) #디스크 캐시 폴더
 app = Flask(__name__)
+metrics = install_metrics(app) #GET /metrics 로 Prometheus 형식 노출
+
+def timed_synthesize(text, tld, lang): #합성 단계만 따로 시간 측정 (캐시 히트는 합성을 안 하므로 기록 안 됨)
+    with metrics.time_step('tts_synthesis'):
+        yield from BACKENDS[TTS_BACKEND](text, tld, lang)
+
+audio_cache = AudioCache(timed_synthesize, TTS_CACHE_DIR)
 
 @app.route("/")
 def home():      #home 변수설정
@@ -12,10 +24,15 @@ def home():      #home 변수설정
     text = "Hello, DevOps"
 
     lang = request.args.get('lang', DEFAULT_LANG) #args 딕셔너리에서 lang 이란 키가 있다면 가져오고 있다면 그 값을 리턴 아니면 DEFAULT_LANG 가져오기
-    fp = BytesIO() #음성 데이터 저장 메모리 만들기.  그럴대 쓰는 것이 BytesIO() 즉 음성데이터 저장 메모리
-    gTTS(text, "com", lang).write_to_fp(fp) #gtts 구글 텍스트 두 스피치 text로 com에서 lang 언어코드 를 이용 /fp 안에 있는 음성데이터를 fp에써주는 작업.
+    key = cache_key(text, "com", lang) #키는 입력만으로 정해지므로 캐시/합성 전에 먼저 계산
+
+    headers = {'ETag': f'"{key}"', 'Cache-Control': 'public, max-age=86400'} #같은 키 = 같은 음성이므로 해시를 그대로 ETag로 사용
+    if key in request.if_none_match: #브라우저가 이미 같은 음성을 가지고 있으면 캐시 조회/합성 없이 바로 304
+        return Response(status=304, headers=headers)
+
+    _, audio = audio_cache.stream(text, "com", lang) #(text, com, lang) 해시로 캐시에서 찾고 없을 때만 gTTS 합성 (같은 키 동시 요청은 합성 1번 공유)
 
-    return Response(fp.getvalue(), mimetype='audio/mpeg') # 페이지 전달없이 바로 재생 fp.getvalue()는 아까만든 가짜 메모리 파일 mimetype='audio/mpeg'는 음성 파일이라고 브라우저에 알려주는 부분.
+    return Response(audio, mimetype='audio/mpeg', headers=headers) # 페이지 전달없이 바로 재생, 캐시 미스면 합성되는 조각을 바로바로 전송(generator). mimetype='audio/mpeg'는 음성 파일이라고 브라우저에 알려주는 부분.
 
 if __name__ == '__main__':
     app.run('0.0.0.0', 5005)
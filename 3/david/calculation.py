@@ -15,12 +15,24 @@ def divide(a,b):
 
 def main():
     try:
-       mode = input('계산 방식 입력(1:수식입력 2: 분해입력):')
+       mode = input('계산 방식 입력(1:수식입력 2: 분해입력 3: 파일 일괄계산):')
 
        if mode == '1' :
-             
-             a, op, b = input("Enter expression: ").split() # 보너스 과제 한 줄로 수식을 입력하면 해당 수식을 해석하여 계산 결과를 출력하는 기능 split은 문자열을 공백 기준으로 문자열을 잘라 리스트로 만들어준다,
-             a, b = float(a), float(b) #문자열 숫자 변환
+             from expression import compile_expression #수식 엔진 (우선순위, 괄호 지원), 순환 import 방지를 위해 여기서 import
+
+             print("결과:", compile_expression(input("Enter expression: ")).evaluate()) # 보너스 과제 한 줄로 수식을 입력하면 해당 수식을 해석하여 계산 결과를 출력하는 기능
+             return
+       elif mode == '3' :
+             from expression import evaluate_file #한 줄에 수식 하나인 파일을 차례로 계산
+
+             for text, result in evaluate_file(input('수식 파일 경로 입력:').strip()):
+                  if isinstance(result, ZeroDivisionError):
+                       print(f"{text} = Error: Division by zero.")
+                  elif isinstance(result, ValueError):
+                       print(f"{text} = 잘못된 수식 입니다")
+                  else:
+                       print(f"{text} = {result}")
+             return
        elif mode == '2' :
             a = float(input('첫번째 숫자 입력:'))
             op = input("연산자 입력(+, -, *, /):")
@@ -0,0 +1,224 @@
+import re #토큰 분리용 정규식
+from functools import lru_cache #같은 수식은 한 번만 컴파일
+from calculation import add, subtract, multiply, divide #기존 사칙연산 함수를 그대로 사용 (0 나누기 → ZeroDivisionError)
+
+# 수식 엔진: 문자열 수식 → 토큰 → 구문 트리(우선순위/괄호/변수) → 파이썬 함수로 한 번 컴파일
+#   expr   := term (('+' | '-') term)*
+#   term   := unary (('*' | '/') unary)*
+#   unary  := ('+' | '-') unary | atom
+#   atom   := 숫자 | 변수 | '(' expr ')'
+# 컴파일된 함수는 스칼라, NumPy 배열(일괄), 행(row) 스트림에 재사용된다.
+
+_TOKEN = re.compile(r"\s*(?:(\d+\.?\d*(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)|([A-Za-z_]\w*)|(.))")
+
+_BINARY = {'+': '_add', '-': '_sub', '*': '_mul', '/': '_div'}
+
+
+def tokenize(text):
+    tokens = []
+    for num, name, op in _TOKEN.findall(text.strip()):
+        if num:
+            tokens.append(('num', float(num)))
+        elif name:
+            tokens.append(('name', name))
+        elif op in '+-*/()':
+            tokens.append(('op', op))
+        elif op.strip():
+            raise ValueError(f'알 수 없는 문자: {op}') #기존 main의 ValueError 처리와 같은 경로
+    return tokens
+
+
+class _Parser: #재귀 하강 파서, 결과는 ('num', v) / ('var', name) / ('neg', node) / (op, left, right) 튜플
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+        self.variables = [] #처음 등장한 순서대로
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self):
+        tok = self.peek()
+        self.pos += 1
+        return tok
+
+    def parse(self):
+        try:
+            node = self.expr()
+        except RecursionError: #괄호/단항 부호가 너무 깊으면 재귀 한도 초과 → 잘못된 수식과 같은 경로로
+            raise ValueError('수식이 너무 깊게 중첩되어 있습니다') from None
+        if self.pos != len(self.tokens):
+            raise ValueError(f'수식 해석 실패: {self.peek()[1]!r} 위치')
+        return node
+
+    def expr(self):
+        node = self.term()
+        while self.peek() in (('op', '+'), ('op', '-')):
+            op = self.take()[1]
+            node = (op, node, self.term())
+        return node
+
+    def term(self):
+        node = self.unary()
+        while self.peek() in (('op', '*'), ('op', '/')):
+            op = self.take()[1]
+            node = (op, node, self.unary())
+        return node
+
+    def unary(self):
+        if self.peek() == ('op', '-'):
+            self.take()
+            return ('neg', self.unary())
+        if self.peek() == ('op', '+'):
+            self.take()
+            return self.unary()
+        return self.atom()
+
+    def atom(self):
+        kind, value = self.take()
+        if kind == 'num':
+            return ('num', value)
+        if kind == 'name':
+            if value not in self.variables:
+                self.variables.append(value)
+            return ('var', value)
+        if (kind, value) == ('op', '('):
+            node = self.expr()
+            if self.take() != ('op', ')'):
+                raise ValueError('괄호가 닫히지 않았습니다')
+            return node
+        raise ValueError('수식이 올바르지 않습니다')
+
+
+def _to_source(node, consts): #구문 트리 → 파이썬 식 문자열 (변수는 v_ 접두어로 내부 이름과 충돌 방지)
+    kind = node[0]
+    if kind == 'num': #숫자는 repr 대신 _k0, _k1 ... 이름으로 넘김 (1e400 → inf 처럼 repr이 식이 안 되는 값 대비)
+        consts.append(node[1])
+        return f'_k{len(consts) - 1}'
+    if kind == 'var':
+        return f'v_{node[1]}'
+    if kind == 'neg':
+        return f'(-{_to_source(node[1], consts)})'
+    return f'{_BINARY[kind]}({_to_source(node[1], consts)}, {_to_source(node[2], consts)})'
+
+
+def _array_ops(np, zero_masks): #배열용 연산: 0으로 나눈 원소는 NaN으로 두고 위치를 기록
+    def _div(a, b):
+        b = np.asarray(b, dtype=float)
+        zero = b == 0
+        if zero.any():
+            zero_masks.append(zero)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(zero, np.nan, np.divide(a, np.where(zero, 1.0, b)))
+    return {'_add': np.add, '_sub': np.subtract, '_mul': np.multiply, '_div': _div}
+
+
+class CompiledExpression:
+
+    def __init__(self, text):
+        parser = _Parser(tokenize(text))
+        tree = parser.parse()
+        self.text = text
+        self.variables = tuple(parser.variables)
+        consts = []
+        try: #트리는 만들어져도 생성한 식이 파이썬 컴파일러의 중첩 한도(괄호 약 200단)를 넘을 수 있음
+            self._source = f"lambda {', '.join('v_' + v for v in self.variables)}: {_to_source(tree, consts)}"
+            self._code = compile(self._source, '<expression>', 'eval')
+        except (RecursionError, SyntaxError, MemoryError):
+            raise ValueError('수식이 너무 깊게 중첩되어 있습니다') from None
+        self._consts = {f'_k{i}': k for i, k in enumerate(consts)}
+        self._scalar = eval(self._code, {'__builtins__': {}, **self._consts, '_add': add, '_sub': subtract, '_mul': multiply, '_div': divide})
+
+    def _args(self, values):
+        try:
+            return [values[v] for v in self.variables]
+        except KeyError as e:
+            raise ValueError(f'변수 값이 없습니다: {e.args[0]}')
+
+    def evaluate(self, **values): #스칼라 1회 계산, 0으로 나누면 ZeroDivisionError (기존 divide와 동일)
+        return self._scalar(*self._args(values))
+
+    def evaluate_array(self, **arrays):
+        """NumPy 배열 일괄 계산 → (결과 배열, 0 나누기 발생 여부 bool 배열)
+
+        원소마다 ZeroDivisionError 대신 결과는 NaN, errors 마스크는 True가 된다.
+        """
+        import numpy as np
+        zero_masks = []
+        fn = eval(self._code, {'__builtins__': {}, **self._consts, **_array_ops(np, zero_masks)})
+        args = [np.asarray(a, dtype=float) for a in self._args(arrays)]
+        result = np.asarray(fn(*args), dtype=float)
+        errors = np.zeros(result.shape, dtype=bool)
+        for mask in zero_masks:
+            errors |= np.broadcast_to(mask, result.shape)
+        return result, errors
+
+    def evaluate_rows(self, rows):
+        """행 스트림 계산. 행은 dict(변수명→값) 또는 self.variables 순서의 시퀀스
+
+        행마다 결과 float, 0으로 나눴으면 ZeroDivisionError, 값이 없거나 숫자가 아니면 ValueError 객체를
+        yield 한다 (evaluate_file과 같이 한 행의 오류가 스트림 전체를 멈추지 않음).
+        """
+        fn = self._scalar
+        names = self.variables
+        for row in rows:
+            try:
+                args = [float(row[v]) for v in names] if isinstance(row, dict) else [float(x) for x in row]
+            except KeyError as e:
+                yield ValueError(f'변수 값이 없습니다: {e.args[0]}')
+                continue
+            except (ValueError, TypeError): #빈 칸(''), 숫자가 아닌 값, 필드가 모자란 행(None)
+                yield ValueError(f'숫자가 아닌 값이 있습니다: {row!r}')
+                continue
+            if len(args) != len(names):
+                yield ValueError(f'값 개수가 변수 개수({len(names)})와 다릅니다: {row!r}')
+                continue
+            try:
+                yield fn(*args)
+            except ZeroDivisionError as e:
+                yield e
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(text):
+    return CompiledExpression(text)
+
+
+def evaluate_file(path): #한 줄에 수식 하나인 파일을 차례로 계산 (같은 수식은 컴파일 캐시 재사용)
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                yield line, compile_expression(line).evaluate()
+            except (ValueError, ZeroDivisionError) as e:
+                yield line, e
+
+
+if __name__ == '__main__':
+    import argparse
+    import csv
+    ap = argparse.ArgumentParser(description='수식 일괄 계산기')
+    ap.add_argument('source', help='수식 파일(한 줄 한 수식) 또는 --rows와 함께 쓸 수식 문자열')
+    ap.add_argument('--rows', help='변수 값 CSV (헤더=변수명). 주어지면 source 수식을 행마다 계산')
+    args = ap.parse_args()
+    if args.rows:
+        expr = compile_expression(args.source)
+        with open(args.rows, encoding='utf-8', newline='') as f:
+            for result in expr.evaluate_rows(csv.DictReader(f)):
+                if isinstance(result, ZeroDivisionError):
+                    print('Error: Division by zero.')
+                elif isinstance(result, ValueError):
+                    print(f'Error: {result}')
+                else:
+                    print(result)
+    else:
+        for text, result in evaluate_file(args.source):
+            if isinstance(result, ZeroDivisionError):
+                print(f'{text} = Error: Division by zero.')
+            elif isinstance(result, ValueError):
+                print(f'{text} = Error: {result}')
+            else:
+                print(f'{text} = {result}')
@@ -0,0 +1,383 @@
+from __future__ import annotations
+
+import hashlib #캐시 키(해시) 만들기
+
+import os
+
+import threading
+
+from collections import OrderedDict
+
+from contextlib import contextmanager
+
+from pathlib import Path
+
+from typing import Callable, Iterable, Iterator
+
+# 음성 합성 결과 2단 캐시: 메모리 LRU → 디스크 → (없으면) 합성
+# 같은 (text, tld, lang)이면 같은 mp3이므로 해시를 키로 쓰고 ETag로도 그대로 사용한다.
+# 캐시에 없는 키를 동시에 여러 요청이 찾으면 합성은 한 번만 하고(single-flight)
+# 만들어지는 조각(chunk)을 모든 요청이 함께 받아 간다.
+# worker 프로세스가 여러 개면(common.serve) 디스크 캐시 폴더의 <key>.lock 파일 잠금으로
+# 다른 프로세스의 합성이 끝나길 기다렸다가 그 결과를 디스크에서 읽는다.
+
+Synthesizer = Callable[[str, str, str], Iterable[bytes]] # (text, tld, lang) -> mp3 조각들
+
+
+def gtts_synthesize(text: str, tld: str, lang: str) -> Iterator[bytes]: #기본 백엔드: 구글 TTS (문장 조각마다 바로 yield)
+
+    from gtts import gTTS
+
+    yield from gTTS(text, tld, lang).stream()
+
+
+def stub_synthesize(text: str, tld: str, lang: str) -> Iterator[bytes]: #테스트용 로컬 백엔드 (네트워크 없이 고정 bytes)
+
+    yield b"ID3STUB|"
+
+    yield f"{tld}|{lang}|{text}".encode("utf-8")
+
+
+BACKENDS: dict[str, Synthesizer] = {"gtts": gtts_synthesize, "stub": stub_synthesize}
+
+
+def cache_key(text: str, tld: str, lang: str) -> str:
+
+    return hashlib.sha256(f"{tld}\0{lang}\0{text}".encode("utf-8")).hexdigest()
+
+
+class _Flight: #진행 중인 합성 하나. 조각을 쌓아 두고 기다리는 요청들을 깨운다
+
+    def __init__(self):
+
+        self.chunks: list[bytes] = []
+
+        self.done = False
+
+        self.error: BaseException | None = None
+
+        self._cond = threading.Condition()
+
+
+    def add(self, chunk: bytes) -> None:
+
+        with self._cond:
+
+            self.chunks.append(chunk)
+
+            self._cond.notify_all()
+
+
+    def finish(self, error: BaseException | None = None) -> None:
+
+        with self._cond:
+
+            self.done = True
+
+            self.error = error
+
+            self._cond.notify_all()
+
+
+    def __iter__(self) -> Iterator[bytes]: #처음 조각부터 차례로, 아직 안 만들어졌으면 기다렸다가 yield
+
+        i = 0
+
+        while True:
+
+            with self._cond:
+
+                while i >= len(self.chunks) and not self.done:
+
+                    self._cond.wait()
+
+                if i < len(self.chunks):
+
+                    chunk = self.chunks[i]
+
+                elif self.error is not None:
+
+                    raise self.error
+
+                else:
+
+                    return
+
+            i += 1
+
+            yield chunk
+
+
+class AudioCache:
+
+    def __init__(self, synthesize: Synthesizer = gtts_synthesize, cache_dir: str | Path | None = None,
+                 max_memory_bytes: int = 32 * 1024 * 1024, max_disk_bytes: int = 512 * 1024 * 1024):
+
+        self.synthesize = synthesize
+
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+
+        self.max_memory_bytes = max_memory_bytes
+
+        self.max_disk_bytes = max_disk_bytes
+
+        self._mem: OrderedDict[str, bytes] = OrderedDict()
+
+        self._mem_bytes = 0
+
+        self._lock = threading.Lock()
+
+        self._flights: dict[str, _Flight] = {}
+
+        if self.cache_dir:
+
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+
+    # ---------------------------------------------------------------- 메모리(LRU)
+
+    def _mem_get(self, key: str) -> bytes | None:
+
+        with self._lock:
+
+            data = self._mem.get(key)
+
+            if data is not None:
+
+                self._mem.move_to_end(key) #최근 사용으로 표시
+
+            return data
+
+
+    def _mem_put(self, key: str, data: bytes) -> None:
+
+        if len(data) > self.max_memory_bytes:
+
+            return
+
+        with self._lock:
+
+            old = self._mem.pop(key, None)
+
+            if old is not None:
+
+                self._mem_bytes -= len(old)
+
+            self._mem[key] = data
+
+            self._mem_bytes += len(data)
+
+            while self._mem_bytes > self.max_memory_bytes: #크기 기준으로 가장 오래 안 쓴 것부터 제거
+
+                _, evicted = self._mem.popitem(last=False)
+
+                self._mem_bytes -= len(evicted)
+
+
+    # ---------------------------------------------------------------- 디스크
+
+    def _disk_path(self, key: str) -> Path:
+
+        return self.cache_dir / f"{key}.mp3"
+
+
+    def _disk_get(self, key: str) -> bytes | None:
+
+        if not self.cache_dir:
+
+            return None
+
+        path = self._disk_path(key)
+
+        try:
+
+            data = path.read_bytes()
+
+        except FileNotFoundError:
+
+            return None
+
+        os.utime(path) #mtime 갱신 → 디스크 LRU 순서
+
+        return data
+
+
+    def _disk_put(self, key: str, data: bytes) -> None:
+
+        if not self.cache_dir:
+
+            return
+
+        tmp = self._disk_path(key).with_suffix(f".{threading.get_ident()}.tmp")
+
+        tmp.write_bytes(data)
+
+        os.replace(tmp, self._disk_path(key)) #반쯤 쓰인 파일이 읽히지 않도록 rename
+
+        self._evict_disk()
+
+
+    def _evict_disk(self) -> None:
+
+        files = []
+
+        total = 0
+
+        for p in self.cache_dir.glob("*.mp3"):
+
+            try:
+
+                st = p.stat()
+
+            except FileNotFoundError:
+
+                continue
+
+            files.append((st.st_mtime, st.st_size, p))
+
+            total += st.st_size
+
+        for _, size, p in sorted(files):
+
+            if total <= self.max_disk_bytes:
+
+                break
+
+            p.unlink(missing_ok=True)
+
+            p.with_suffix(".lock").unlink(missing_ok=True)
+
+            total -= size
+
+
+    # ---------------------------------------------------------------- single-flight 합성
+
+    @contextmanager
+    def _process_lock(self, key: str) -> Iterator[None]: #프로세스 사이 single-flight (디스크 캐시가 없거나 fcntl이 없으면 생략)
+
+        try:
+
+            import fcntl
+
+        except ImportError:
+
+            fcntl = None
+
+        if not self.cache_dir or fcntl is None:
+
+            yield
+
+            return
+
+        with open(self.cache_dir / f"{key}.lock", "wb") as f:
+
+            fcntl.flock(f, fcntl.LOCK_EX)
+
+            try:
+
+                yield
+
+            finally:
+
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+    def _run_flight(self, key: str, flight: _Flight, text: str, tld: str, lang: str) -> None:
+
+        #요청 스레드가 아니라 별도 스레드에서 합성 → 먼저 온 클라이언트가 끊겨도 나머지는 계속 받는다
+        try:
+
+            with self._process_lock(key):
+
+                data = self._disk_get(key) #잠금을 기다리는 동안 다른 worker가 합성을 끝냈을 수 있음
+
+                if data is not None:
+
+                    flight.add(data)
+
+                else:
+
+                    for chunk in self.synthesize(text, tld, lang):
+
+                        flight.add(chunk)
+
+                    data = b"".join(flight.chunks)
+
+                    self._disk_put(key, data)
+
+            self._mem_put(key, data)
+
+            flight.finish()
+
+        except BaseException as e:
+
+            flight.finish(e)
+
+        finally:
+
+            with self._lock:
+
+                self._flights.pop(key, None)
+
+
+    def _join_flight(self, key: str, text: str, tld: str, lang: str) -> _Flight:
+
+        with self._lock:
+
+            flight = self._flights.get(key)
+
+            if flight is not None:
+
+                return flight
+
+            data = self._mem.get(key) #락 안에서 다시 확인: 방금 끝난 합성이 있을 수 있음
+
+            if data is not None:
+
+                flight = _Flight()
+
+                flight.add(data)
+
+                flight.finish()
+
+                return flight
+
+            flight = self._flights[key] = _Flight()
+
+        threading.Thread(target=self._run_flight, args=(key, flight, text, tld, lang), daemon=True).start()
+
+        return flight
+
+
+    # ---------------------------------------------------------------- 공개 API
+
+    def stream(self, text: str, tld: str, lang: str) -> tuple[str, bytes | Iterator[bytes]]:
+
+        """(key, 본문) 반환. 캐시에 있으면 bytes 전체, 없으면 합성되는 대로 나오는 조각 iterator"""
+
+        key = cache_key(text, tld, lang)
+
+        data = self._mem_get(key)
+
+        if data is not None:
+
+            return key, data
+
+        data = self._disk_get(key)
+
+        if data is not None:
+
+            self._mem_put(key, data)
+
+            return key, data
+
+        return key, iter(self._join_flight(key, text, tld, lang))
+
+
+    def get(self, text: str, tld: str, lang: str) -> tuple[str, bytes]:
+
+        """(key, mp3 bytes) 반환. 메모리 → 디스크 → 합성 순서로 찾는다"""
+
+        key, body = self.stream(text, tld, lang)
+
+        return key, body if isinstance(body, bytes) else b"".join(body)
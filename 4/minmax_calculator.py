@@ -22,4 +22,8 @@ def main():
     print("Max:", maximum)
 
 if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == "--stream": #대용량 모드: 파일/표준입력을 덩어리로 한 번만 읽어 통계 계산
+        from stream_stats import main as stream_main
+        raise SystemExit(stream_main(sys.argv[2:]))
     main()
\ No newline at end of file
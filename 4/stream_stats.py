@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import sys
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# 메모리보다 큰 숫자 입력용 한 번 읽기(one-pass) 통계
+# - 입력을 큰 덩어리(chunk)로 읽어 NumPy로 한 번에 파싱
+# - 덩어리마다 count/min/max/mean/M2를 구해 Welford(Chan) 방식으로 합침 → 평균/분산이 수치적으로 안정
+# - 분위수는 레벨별로 절반씩 솎아내는 KLL 계열 스케치(메모리 상한 고정)
+# - 파일 여러 개는 프로세스 풀에서 따로 계산한 뒤 merge
+
+CHUNK_BYTES = 16 * 1024 * 1024
+
+
+class QuantileSketch:
+
+    def __init__(self, k: int = 4096, seed: int = 0):
+
+        self.k = k
+
+        self.levels: list[np.ndarray] = []
+
+        self._rng = np.random.default_rng(seed)
+
+
+    def add(self, values: np.ndarray, level: int = 0) -> None:
+
+        while len(self.levels) <= level:
+
+            self.levels.append(np.empty(0))
+
+        buf = np.concatenate((self.levels[level], values))
+
+        while len(buf) > self.k:        # 넘치면 정렬 후 하나 건너 하나만 위 레벨(가중치 2배)로 올림
+
+            buf.sort()
+
+            keep = buf[-1:] if len(buf) % 2 else buf[:0]
+
+            promoted = buf[int(self._rng.integers(2)):len(buf) - len(keep):2]
+
+            self.levels[level] = keep
+
+            level += 1
+
+            if len(self.levels) <= level:
+
+                self.levels.append(np.empty(0))
+
+            buf = np.concatenate((self.levels[level], promoted))
+
+        self.levels[level] = buf
+
+
+    def merge(self, other: "QuantileSketch") -> None:
+
+        for level, values in enumerate(other.levels):
+
+            if len(values):
+
+                self.add(values, level)
+
+
+    def quantiles(self, qs) -> list[float]:
+
+        values = np.concatenate(self.levels) if self.levels else np.empty(0)
+
+        if not len(values):
+
+            return [float("nan")] * len(qs)
+
+        weights = np.concatenate([np.full(len(v), 2.0 ** h) for h, v in enumerate(self.levels)])
+
+        order = np.argsort(values, kind="stable")
+
+        cum = np.cumsum(weights[order])
+
+        idx = np.searchsorted(cum, np.asarray(qs) * cum[-1], side="left")
+
+        return values[order][np.minimum(idx, len(values) - 1)].tolist()
+
+
+class StreamStats:
+
+    def __init__(self):
+
+        self.count = 0
+
+        self.mean = 0.0
+
+        self.m2 = 0.0
+
+        self.min = float("inf")
+
+        self.max = float("-inf")
+
+        self.sketch = QuantileSketch()
+
+
+    def _combine(self, n: int, mean: float, m2: float) -> None:     # Chan et al. 병렬 분산 합치기
+
+        total = self.count + n
+
+        delta = mean - self.mean
+
+        self.mean += delta * n / total
+
+        self.m2 += m2 + delta * delta * self.count * n / total
+
+        self.count = total
+
+
+    def update(self, values: np.ndarray) -> None:
+
+        if not len(values):
+
+            return
+
+        mean = float(values.mean())
+
+        self._combine(len(values), mean, float(((values - mean) ** 2).sum()))
+
+        self.min = min(self.min, float(values.min()))
+
+        self.max = max(self.max, float(values.max()))
+
+        self.sketch.add(values)
+
+
+    def merge(self, other: "StreamStats") -> "StreamStats":
+
+        if other.count:
+
+            self._combine(other.count, other.mean, other.m2)
+
+            self.min = min(self.min, other.min)
+
+            self.max = max(self.max, other.max)
+
+            self.sketch.merge(other.sketch)
+
+        return self
+
+
+    @property
+    def variance(self) -> float:        # 모분산 (표본분산은 m2 / (count - 1))
+
+        return self.m2 / self.count if self.count else float("nan")
+
+
+def iter_chunks(f, chunk_bytes: int = CHUNK_BYTES):
+
+    """바이너리 스트림을 숫자 경계(공백)에서 끊어 float64 배열로 돌려준다"""
+
+    rest = b""
+
+    while True:
+
+        data = f.read(chunk_bytes)
+
+        if not data:
+
+            break
+
+        data = rest + data
+
+        cut = max(data.rfind(b" "), data.rfind(b"\n"), data.rfind(b"\t"), data.rfind(b","))
+
+        if cut < 0:
+
+            rest = data
+
+            continue
+
+        rest = data[cut + 1:]
+
+        yield _parse(data[:cut])
+
+    if rest.strip():
+
+        yield _parse(rest)
+
+
+def _parse(data: bytes) -> np.ndarray:
+
+    return np.array(data.replace(b",", b" ").split(), dtype=np.float64)     # 숫자가 아니면 ValueError
+
+
+def stats_of_file(path: str) -> StreamStats:
+
+    stats = StreamStats()
+
+    if path == "-":
+
+        for values in iter_chunks(sys.stdin.buffer):
+
+            stats.update(values)
+
+        return stats
+
+    with open(path, "rb") as f:
+
+        for values in iter_chunks(f):
+
+            stats.update(values)
+
+    return stats
+
+
+def stats_of_files(paths: list[str], jobs: int | None = None) -> StreamStats:
+
+    total = StreamStats()
+
+    if len(paths) == 1 or jobs == 1 or "-" in paths:
+
+        for p in paths:
+
+            total.merge(stats_of_file(p))
+
+        return total
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+
+        for part in pool.map(stats_of_file, paths):
+
+            total.merge(part)
+
+    return total
+
+
+def main(argv: list[str] | None = None) -> int:
+
+    import argparse
+
+    ap = argparse.ArgumentParser(description="대용량 숫자 스트리밍 통계 (min/max/count/mean/variance/분위수)")
+
+    ap.add_argument("files", nargs="*", default=["-"], help="숫자 파일들 (기본/'-': 표준입력)")
+
+    ap.add_argument("--jobs", type=int, default=None, help="병렬 프로세스 수 (기본: CPU 코어 수)")
+
+    args = ap.parse_args(argv)
+
+    try:
+
+        stats = stats_of_files(args.files or ["-"], args.jobs)
+
+    except (ValueError, OSError) as e:
+
+        print(f"Invalid input. ({e})")
+
+        return 1
+
+    if not stats.count:
+
+        print("Invalid input.")
+
+        return 1
+
+    p50, p90, p99 = stats.sketch.quantiles((0.5, 0.9, 0.99))
+
+    print("Min:", stats.min)
+
+    print("Max:", stats.max)
+
+    print("Count:", stats.count)
+
+    print("Mean:", stats.mean)
+
+    print("Variance:", stats.variance)
+
+    print(f"Quantiles(approx): p50={p50} p90={p90} p99={p99}")
+
+    return 0
+
+
+if __name__ == "__main__":
+
+    raise SystemExit(main())
@@ -0,0 +1,440 @@
+from __future__ import annotations
+
+import io
+
+import json
+
+import os
+
+import signal
+
+import socket
+
+import struct
+
+import sys
+
+# 여러 도구를 하나로 묶은 실행기
+#
+#   python -m common.cli <도구> [인자...]
+#   python -m common.cli daemon [--socket 경로]        # 모듈을 미리 import 해 두는 상주 프로세스
+#   CODYSSEY_SOCKET=경로 python -m common.cli <도구> ... # 상주 프로세스가 있으면 거기서 실행
+#
+# 도구 스크립트는 실행할 때만 로드한다(lazy). 이 파일은 시작 비용을 줄이려고
+# argparse/numpy 등 무거운 모듈을 import 하지 않는다.
+# 상주 모드: 요청마다 fork → 자식이 cwd/argv를 받아 스크립트를 __main__으로 실행.
+# stdin은 클라이언트가 조각(b"I" 프레임, 길이 0 = EOF)으로 계속 흘려보내고 자식은 소켓에서 바로 읽는다
+# (입력 전체를 메모리에 올리지 않고, 닫히지 않는 stdin이어도 기다리지 않음).
+# stdout/stderr/종료코드는 같은 방식의 프레임으로 돌려준다. numpy 등은 부모에서 이미 import 되어 있어 바로 시작.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TOOLS = {       # 도구 이름 → 저장소 루트 기준 스크립트 경로
+
+    "analyzer": "main 4-1/main.py",
+
+    "inventory": "main 4-2/inventory_analyzer.py",
+
+    "parts": "main 4-2/parts_analysis_num.py",
+
+    "dome": "main 4-2/design_dome.py",
+
+    "minmax": "4/minmax_calculator.py",
+
+    "power": "2/power_calculator.py",
+}
+
+WARM_MODULES = ("argparse", "csv", "json", "re", "pickle", "decimal", "fractions",
+                "concurrent.futures", "numpy", "flask", "gtts")
+
+DEFAULT_SOCKET = os.path.join(os.environ.get("XDG_RUNTIME_DIR", "/tmp"), "codyssey.sock")
+
+_FRAME = struct.Struct("!cI")       # 종류(b"I" stdin, b"O" stdout, b"E" stderr, b"X" 종료코드) + 길이
+
+STDIN_CHUNK = 64 * 1024
+
+
+def usage() -> str:
+
+    return ("usage: python -m common.cli {" + ",".join(TOOLS) + "} [args...]\n"
+            "       python -m common.cli daemon [--socket PATH]")
+
+
+def run_tool(name: str, args: list[str]) -> int:
+
+    """스크립트를 직접 실행한 것과 같게 (__main__, sys.argv, 같은 폴더 import) 실행"""
+
+    import runpy
+
+    path = os.path.join(ROOT, TOOLS[name])
+
+    sys.argv = [path, *args]
+
+    sys.path.insert(0, os.path.dirname(path))
+
+    try:
+
+        runpy.run_path(path, run_name="__main__")
+
+    except SystemExit as e:
+
+        code = e.code
+
+        if code is None:
+
+            return 0
+
+        if isinstance(code, int):
+
+            return code
+
+        print(code, file=sys.stderr)
+
+        return 1
+
+    finally:
+
+        sys.path.pop(0)
+
+    return 0
+
+
+# ---------------------------------------------------------------------- 프레임 입출력
+
+def _send(sock: socket.socket, kind: bytes, data: bytes) -> None:
+
+    sock.sendall(_FRAME.pack(kind, len(data)) + data)
+
+
+def _recv_exact(f, n: int) -> bytes:
+
+    data = f.read(n)
+
+    if len(data) != n:
+
+        raise ConnectionError("daemon closed the connection")
+
+    return data
+
+
+class _FrameStream:     # 자식의 sys.stdout/sys.stderr 역할 (TextIOWrapper 아래에 붙임)
+
+    def __init__(self, sock: socket.socket, kind: bytes):
+
+        self.sock = sock
+
+        self.kind = kind
+
+        self.closed = False
+
+
+    def writable(self) -> bool:
+
+        return True
+
+
+    def readable(self) -> bool:
+
+        return False
+
+
+    def seekable(self) -> bool:
+
+        return False
+
+
+    def write(self, data) -> int:
+
+        if data:
+
+            _send(self.sock, self.kind, bytes(data))
+
+        return len(data)
+
+
+    def flush(self) -> None:
+
+        pass
+
+
+    def close(self) -> None:
+
+        self.closed = True
+
+
+class _FrameInput(io.RawIOBase):     # 자식의 sys.stdin 역할: 클라이언트가 보내는 b"I" 프레임을 읽음
+
+    def __init__(self, f):
+
+        self.f = f
+
+        self.buf = b""
+
+        self.eof = False
+
+
+    def readable(self) -> bool:
+
+        return True
+
+
+    def readinto(self, b) -> int:
+
+        while not self.buf and not self.eof:
+
+            _, size = _FRAME.unpack(_recv_exact(self.f, _FRAME.size))
+
+            if size == 0:
+
+                self.eof = True
+
+            else:
+
+                self.buf = _recv_exact(self.f, size)
+
+        n = min(len(b), len(self.buf))
+
+        b[:n] = self.buf[:n]
+
+        self.buf = self.buf[n:]
+
+        return n
+
+
+# ---------------------------------------------------------------------- 상주 프로세스
+
+def _serve_one(conn: socket.socket) -> None:
+
+    f = conn.makefile("rb")
+
+    (size,) = struct.unpack("!I", _recv_exact(f, 4))
+
+    req = json.loads(_recv_exact(f, size))
+
+    os.chdir(req["cwd"])
+
+    sys.stdin = io.TextIOWrapper(io.BufferedReader(_FrameInput(f)), encoding="utf-8")
+
+    sys.stdout = io.TextIOWrapper(_FrameStream(conn, b"O"), encoding="utf-8", line_buffering=True, write_through=True)
+
+    sys.stderr = io.TextIOWrapper(_FrameStream(conn, b"E"), encoding="utf-8", line_buffering=True, write_through=True)
+
+    code = 1
+
+    try:
+
+        code = run_tool(req["tool"], req["args"])
+
+    except BaseException:
+
+        import traceback
+
+        traceback.print_exc()
+
+    finally:
+
+        sys.stdout.flush()
+
+        sys.stderr.flush()
+
+        _send(conn, b"X", struct.pack("!i", code))
+
+        conn.close()
+
+
+def serve_daemon(path: str) -> None:
+
+    import importlib
+
+    for mod in WARM_MODULES:        # 설치 안 된 선택 모듈은 건너뜀
+
+        try:
+
+            importlib.import_module(mod)
+
+        except ImportError:
+
+            pass
+
+    if os.path.exists(path):
+
+        os.unlink(path)
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    server.bind(path)
+
+    os.chmod(path, 0o600)
+
+    server.listen(64)
+
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)       # 자식은 자동 회수
+
+    signal.signal(signal.SIGTERM, signal.default_int_handler)      # kill로도 소켓 파일을 정리하고 종료
+
+    print(f"[daemon] {path} (pid {os.getpid()})")
+
+    try:
+
+        while True:
+
+            conn, _ = server.accept()
+
+            if os.fork() == 0:
+
+                server.close()
+
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)     # 도구가 띄우는 프로세스 풀이 자식을 기다릴 수 있도록
+
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+                try:
+
+                    _serve_one(conn)
+
+                finally:
+
+                    os._exit(0)
+
+            conn.close()
+
+    except KeyboardInterrupt:
+
+        pass
+
+    finally:
+
+        server.close()
+
+        os.unlink(path)
+
+
+def run_via_daemon(path: str, tool: str, args: list[str]) -> int | None:
+
+    """상주 프로세스에 실행을 맡긴다. 연결할 수 없거나 대화형 입력(tty)이면 None → 직접 실행"""
+
+    if sys.stdin is not None and sys.stdin.isatty():       # stdin이 없으면(None) 빈 입력으로 맡김
+
+        return None
+
+    try:
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+        sock.connect(path)
+
+    except OSError:
+
+        return None
+
+    import threading
+
+    req = json.dumps({"tool": tool, "args": args, "cwd": os.getcwd()}).encode("utf-8")
+
+    sock.sendall(struct.pack("!I", len(req)) + req)
+
+    def _forward_stdin() -> None:      # 출력 수신과 따로 돌아감. 도구가 stdin을 안 읽고 끝나면 그대로 버려짐
+
+        try:
+
+            fd = sys.stdin.fileno() if sys.stdin is not None else None
+
+            while fd is not None:
+
+                data = os.read(fd, STDIN_CHUNK)     # 버퍼 객체를 거치지 않아 종료 시 잠금에 걸리지 않음
+
+                if not data:
+
+                    break
+
+                _send(sock, b"I", data)
+
+            _send(sock, b"I", b"")
+
+        except (OSError, ValueError):      # 자식이 먼저 끝나 연결이 닫힘
+
+            pass
+
+    threading.Thread(target=_forward_stdin, daemon=True).start()
+
+    f = sock.makefile("rb")
+
+    out = {b"O": sys.stdout.buffer, b"E": sys.stderr.buffer}
+
+    try:
+
+        while True:
+
+            kind, size = _FRAME.unpack(_recv_exact(f, _FRAME.size))
+
+            data = _recv_exact(f, size)
+
+            if kind == b"X":
+
+                sys.stdout.flush()
+
+                return struct.unpack("!i", data)[0]
+
+            out[kind].write(data)
+
+            out[kind].flush()
+
+    except BrokenPipeError:         # 출력을 받던 쪽이 먼저 끝남 (... | head) → 연결을 닫으면 자식도 멈춤
+
+        devnull = os.open(os.devnull, os.O_WRONLY)
+
+        os.dup2(devnull, sys.stdout.fileno())       # 종료 때 남은 버퍼 flush가 다시 실패하지 않도록
+
+        os.close(devnull)
+
+        return 128 + signal.SIGPIPE      # 셸이 SIGPIPE로 끝난 명령에 주는 것과 같은 코드
+
+    finally:
+
+        f.close()
+
+        sock.close()
+
+
+def main(argv: list[str] | None = None) -> int:
+
+    argv = sys.argv[1:] if argv is None else argv
+
+    if not argv or argv[0] in ("-h", "--help"):
+
+        print(usage())
+
+        return 0 if argv else 2
+
+    cmd, rest = argv[0], argv[1:]
+
+    if cmd == "daemon":
+
+        path = rest[rest.index("--socket") + 1] if "--socket" in rest else DEFAULT_SOCKET
+
+        serve_daemon(path)
+
+        return 0
+
+    if cmd not in TOOLS:
+
+        print(usage(), file=sys.stderr)
+
+        return 2
+
+    daemon_path = os.environ.get("CODYSSEY_SOCKET")
+
+    if daemon_path:
+
+        code = run_via_daemon(daemon_path, cmd, rest)
+
+        if code is not None:
+
+            return code
+
+    return run_tool(cmd, rest)
+
+
+if __name__ == "__main__":
+
+    raise SystemExit(main())
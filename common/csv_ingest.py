@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import csv
+
+from pathlib import Path
+
+from typing import Any, Callable, Iterator, NamedTuple
+
+# 공용 CSV 읽기 계층
+#   Schema(어떤 컬럼을, 어떤 타입으로, 무엇이 필수인지)를 헤더에 맞춰 한 번 컴파일하면
+#   행마다 dict를 만들지 않고 tuple 하나만 만드는 전용 파서 함수가 생긴다.
+#   변환 실패/필수값 누락 행은 예외로 흐름을 끊지 않고 Rejected 목록으로 한꺼번에 돌려준다.
+#
+#   schema = Schema(types={"flammability": float}, required=("flammability",))
+#   data = read_rows(Path("list.csv"), schema)
+#   data.names, data.rows (tuple 목록), data.rejected
+#
+#   derived={"_fi": ("flammability", float)} → 원본 문자열 컬럼은 그대로 두고 변환값을 맨 뒤 칸에 하나 더
+
+
+class Rejected(NamedTuple):
+
+    line: int           # 데이터 행 번호 (헤더 제외, 1부터)
+
+    row: list           # 원본 필드
+
+    error: str
+
+
+class RowParser:
+
+    def __init__(self, names: list[str], indices: list[int], converters: list[Callable | None],
+                 required: list[int], strip: bool, width: int):
+
+        self.names = names
+
+        self.width = width      # 빠른 경로를 쓸 수 있는 최소 필드 수
+
+        self._indices = indices
+
+        self._converters = converters
+
+        self._required = required
+
+        self._strip = strip
+
+        # 예) lambda r: (r[0].strip(), _c1(r[2].strip()))  → 컬럼 수만큼 풀어 쓴 전용 함수
+        parts = []
+
+        env: dict[str, Any] = {"__builtins__": {}}
+
+        for j, (i, conv) in enumerate(zip(indices, converters)):
+
+            cell = f"r[{i}].strip()" if strip else f"r[{i}]"
+
+            if conv is not None:
+
+                env[f"_c{j}"] = conv
+
+                cell = f"_c{j}({cell})"
+
+            parts.append(cell)
+
+        self._fast = eval(f"lambda r: ({', '.join(parts)},)", env)
+
+
+    def _slow(self, row: list) -> tuple:        # 필드가 모자란 행: 없는 값은 None (csv.DictReader와 같음)
+
+        out = []
+
+        for i, conv in zip(self._indices, self._converters):
+
+            v = row[i] if i < len(row) else None
+
+            if v is not None:
+
+                if self._strip:
+
+                    v = v.strip()
+
+                if conv is not None:
+
+                    v = conv(v)
+
+            out.append(v)
+
+        return tuple(out)
+
+
+    def parse(self, row: list) -> tuple:
+
+        """변환된 tuple 반환. 변환 실패나 필수값 누락이면 ValueError"""
+
+        out = self._fast(row) if len(row) >= self.width else self._slow(row)
+
+        for j in self._required:
+
+            if out[j] is None or out[j] == "":
+
+                raise ValueError(f"필수 값 없음: {self.names[j]}")
+
+        return out
+
+
+class Schema:
+
+    def __init__(self, columns: list[str] | None = None, types: dict[str, Callable] | None = None,
+                 required: tuple[str, ...] = (), strip: bool = True,
+                 derived: dict[str, tuple[str, Callable]] | None = None):
+
+        self.columns = columns          # None이면 헤더의 모든 컬럼을 헤더 순서대로
+
+        self.types = types or {}
+
+        self.required = required
+
+        self.strip = strip
+
+        self.derived = derived or {}     # 출력 이름 → (원본 컬럼, 변환 함수)
+
+
+    def compile(self, header: list[str]) -> RowParser:
+
+        header = [h.strip() if self.strip else h for h in header]
+
+        names = list(self.columns) if self.columns is not None else list(header)
+
+        missing = [n for n in (*names, *self.required, *(src for src, _ in self.derived.values())) if n not in header]
+
+        if missing:
+
+            raise KeyError(f"CSV에 컬럼이 없습니다: {', '.join(dict.fromkeys(missing))}")
+
+        for n in self.required:
+
+            if n not in names:
+
+                names.append(n)
+
+        indices = [header.index(n) for n in names]
+
+        converters = [self.types.get(n) for n in names]
+
+        required = [j for j, n in enumerate(names) if n in self.required]
+
+        for out, (src, conv) in self.derived.items():
+
+            names.append(out)
+
+            indices.append(header.index(src))
+
+            converters.append(conv)
+
+        return RowParser(
+
+            names,
+
+            indices,
+
+            converters,
+
+            required,
+
+            self.strip,
+
+            max(indices) + 1 if indices else 0,
+        )
+
+
+class Ingested(NamedTuple):
+
+    names: list[str]
+
+    rows: list[tuple]
+
+    rejected: list[Rejected]
+
+
+def _parsed(f, schema: Schema, rejected: list[Rejected]) -> tuple[list[str], Iterator[tuple[int, tuple]]]:
+
+    reader = csv.reader(f)
+
+    header = next(reader, None)
+
+    if header is None:
+
+        return [], iter(())
+
+    parser = schema.compile(header)
+
+    def _rows() -> Iterator[tuple[int, tuple]]:
+
+        parse = parser.parse
+
+        line = 0
+
+        for row in reader:
+
+            if not row:         # 빈 줄은 DictReader처럼 건너뜀
+
+                continue
+
+            line += 1
+
+            try:
+
+                yield line, parse(row)
+
+            except (ValueError, TypeError) as e:
+
+                rejected.append(Rejected(line, row, str(e)))
+
+    return parser.names, _rows()
+
+
+def read_rows(path: Path, schema: Schema, encoding: str = "utf-8") -> Ingested:
+
+    rejected: list[Rejected] = []
+
+    with Path(path).open("r", encoding=encoding, newline="") as f:
+
+        names, rows = _parsed(f, schema, rejected)
+
+        return Ingested(names, [r for _, r in rows], rejected)
+
+
+def iter_batches(path: Path, schema: Schema, batch_size: int = 65_536,
+                 encoding: str = "utf-8", rejected: list[Rejected] | None = None) -> Iterator[dict[str, list]]:
+
+    """컬럼 단위 배치({컬럼명: 값 리스트})로 흘려보낸다. 거부된 행은 rejected 리스트에 쌓인다"""
+
+    rejected = [] if rejected is None else rejected
+
+    with Path(path).open("r", encoding=encoding, newline="") as f:
+
+        names, rows = _parsed(f, schema, rejected)
+
+        batch: list[tuple] = []
+
+        for _, row in rows:
+
+            batch.append(row)
+
+            if len(batch) >= batch_size:
+
+                yield dict(zip(names, map(list, zip(*batch))))
+
+                batch = []
+
+        if batch:
+
+            yield dict(zip(names, map(list, zip(*batch))))
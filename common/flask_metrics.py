@@ -0,0 +1,408 @@
+from __future__ import annotations
+
+import os
+
+import pickle
+
+import threading
+
+import time
+
+from bisect import bisect_left
+
+from contextlib import contextmanager
+
+from typing import Iterator
+
+from flask import Flask, Response, g, request
+
+# 여러 Flask 앱이 같이 쓰는 요청 계측 미들웨어
+#   - 라우트/메서드/상태코드별 요청 수
+#   - 라우트별 지연시간, 응답 크기 히스토그램 (스트리밍 응답은 마지막 바이트까지 포함)
+#   - 앱 안의 특정 단계(예: TTS 합성) 시간 측정
+# GET /metrics 로 Prometheus 텍스트 형식(text/plain; version=0.0.4) 노출
+#
+# prefork(common.serve)처럼 worker 프로세스가 여러 개면 환경변수 METRICS_DIR 폴더를 공유한다.
+#   각 worker는 자기 집계를 METRICS_DIR/<pid>-<시작시각>.pickle 로 주기적으로(FLUSH_INTERVAL) 덮어쓰고,
+#   /metrics 에 응답하는 worker는 자기 메모리 값 + 다른 worker 파일을 합쳐서 보여 준다.
+#   끝난 worker의 파일도 남겨 두므로 카운터가 줄어들지 않는다.
+
+METRICS_DIR_ENV = "METRICS_DIR"
+
+FLUSH_INTERVAL = 0.5
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+class _Histogram:
+
+    def __init__(self, buckets: tuple[float, ...]):
+
+        self.buckets = buckets
+
+        self.counts = [0] * (len(buckets) + 1)     # 마지막 칸은 +Inf
+
+        self.sum = 0.0
+
+        self.count = 0
+
+
+    def observe(self, value: float) -> None:
+
+        self.counts[bisect_left(self.buckets, value)] += 1
+
+        self.sum += value
+
+        self.count += 1
+
+
+    def merge(self, counts: list[int], total: float, count: int) -> None:
+
+        self.counts = [a + b for a, b in zip(self.counts, counts)]
+
+        self.sum += total
+
+        self.count += count
+
+
+    def render(self, name: str, labels: str) -> list[str]:
+
+        sep = "," if labels else ""
+
+        lines = []
+
+        cum = 0
+
+        for le, n in zip(self.buckets, self.counts):
+
+            cum += n
+
+            lines.append(f'{name}_bucket{{{labels}{sep}le="{le:g}"}} {cum}')
+
+        lines.append(f'{name}_bucket{{{labels}{sep}le="+Inf"}} {self.count}')
+
+        lines.append(f"{name}_sum{{{labels}}} {self.sum:.6f}")
+
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+
+        return lines
+
+
+def _esc(v: str) -> str:
+
+    return v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_LIVE: list["Metrics"] = []     # 공유 폴더를 쓰는 Metrics (flush_all 대상)
+
+
+def flush_all() -> None:
+
+    """worker 종료 직전 호출: 아직 파일에 안 쓴 집계를 저장"""
+
+    for m in _LIVE:
+
+        if m._dirty:
+
+            m.flush()
+
+
+class Metrics:
+
+    def __init__(self, shared_dir: str | None = None):
+
+        self.shared_dir = shared_dir
+
+        self._pid = os.getpid()       # fork된 worker에서 처음 쓰일 때 집계를 비우고 flush 스레드 시작
+
+        self._file = f"{self._pid}-{time.time_ns()}.pickle"     # pid가 재사용돼도 끝난 worker 파일을 덮어쓰지 않도록
+
+        self._dirty = False
+
+        self._reset()
+
+        if shared_dir:
+
+            _LIVE.append(self)
+
+
+    def _reset(self) -> None:
+
+        self._lock = threading.Lock()
+
+        self._requests: dict[tuple[str, str, str], int] = {}
+
+        self._latency: dict[tuple[str, str], _Histogram] = {}
+
+        self._size: dict[tuple[str, str], _Histogram] = {}
+
+        self._steps: dict[str, _Histogram] = {}
+
+
+    def _check_fork(self) -> None:
+
+        if self.shared_dir and self._pid != os.getpid():
+
+            self._pid = os.getpid()
+
+            self._file = f"{self._pid}-{time.time_ns()}.pickle"
+
+            self._reset()       # 부모에서 물려받은 값은 부모 몫
+
+            threading.Thread(target=self._flush_loop, daemon=True).start()
+
+
+    def _flush_loop(self) -> None:
+
+        pid = self._pid
+
+        while self._pid == pid:
+
+            time.sleep(FLUSH_INTERVAL)
+
+            if self._dirty:
+
+                self.flush()
+
+
+    def _state(self) -> dict:
+
+        with self._lock:
+
+            hist = lambda d: {k: (list(h.counts), h.sum, h.count) for k, h in d.items()}
+
+            return {"requests": dict(self._requests), "latency": hist(self._latency),
+                    "size": hist(self._size), "steps": hist(self._steps)}
+
+
+    def flush(self) -> None:
+
+        if not self.shared_dir:
+
+            return
+
+        self._dirty = False
+
+        path = os.path.join(self.shared_dir, self._file)
+
+        tmp = path + ".tmp"
+
+        with open(tmp, "wb") as f:
+
+            pickle.dump(self._state(), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        os.replace(tmp, path)
+
+
+    def _merged(self) -> dict:
+
+        """자기 집계 + (공유 폴더가 있으면) 다른 worker들의 마지막 저장 값"""
+
+        states = [self._state()]
+
+        if self.shared_dir:
+
+            for name in os.listdir(self.shared_dir):
+
+                if name.endswith(".pickle") and name != self._file:
+
+                    try:
+
+                        with open(os.path.join(self.shared_dir, name), "rb") as f:
+
+                            states.append(pickle.load(f))
+
+                    except (OSError, EOFError, pickle.UnpicklingError):
+
+                        continue
+
+        out: dict = {"requests": {}, "latency": {}, "size": {}, "steps": {}}
+
+        for st in states:
+
+            for k, n in st["requests"].items():
+
+                out["requests"][k] = out["requests"].get(k, 0) + n
+
+            for kind, buckets in (("latency", LATENCY_BUCKETS), ("size", SIZE_BUCKETS), ("steps", LATENCY_BUCKETS)):
+
+                for k, (counts, total, count) in st[kind].items():
+
+                    out[kind].setdefault(k, _Histogram(buckets)).merge(counts, total, count)
+
+        return out
+
+
+    def observe_request(self, route: str, method: str, status: int, seconds: float, size: int) -> None:
+
+        self._check_fork()
+
+        with self._lock:
+
+            self._dirty = True
+
+            key = (route, method, str(status))
+
+            self._requests[key] = self._requests.get(key, 0) + 1
+
+            rk = (route, method)
+
+            if rk not in self._latency:
+
+                self._latency[rk] = _Histogram(LATENCY_BUCKETS)
+
+                self._size[rk] = _Histogram(SIZE_BUCKETS)
+
+            self._latency[rk].observe(seconds)
+
+            self._size[rk].observe(size)
+
+
+    def observe_step(self, step: str, seconds: float) -> None:
+
+        self._check_fork()
+
+        with self._lock:
+
+            self._dirty = True
+
+            hist = self._steps.get(step)
+
+            if hist is None:
+
+                hist = self._steps[step] = _Histogram(LATENCY_BUCKETS)
+
+            hist.observe(seconds)
+
+
+    @contextmanager
+    def time_step(self, step: str) -> Iterator[None]:
+
+        """with metrics.time_step("tts_synthesis"): ... 블록 실행 시간을 단계별로 기록"""
+
+        t0 = time.perf_counter()
+
+        try:
+
+            yield
+
+        finally:
+
+            self.observe_step(step, time.perf_counter() - t0)
+
+
+    def render(self) -> str:
+
+        self._check_fork()
+
+        data = self._merged()
+
+        lines = [
+
+            "# HELP http_requests_total Total HTTP requests by route, method and status.",
+
+            "# TYPE http_requests_total counter",
+        ]
+
+        for (route, method, status), n in sorted(data["requests"].items()):
+
+            lines.append(f'http_requests_total{{route="{_esc(route)}",method="{method}",status="{status}"}} {n}')
+
+        lines += [
+
+            "# HELP http_request_duration_seconds Request latency until the last body byte.",
+
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+
+        for (route, method), hist in sorted(data["latency"].items()):
+
+            lines += hist.render("http_request_duration_seconds", f'route="{_esc(route)}",method="{method}"')
+
+        lines += [
+
+            "# HELP http_response_size_bytes Response body size.",
+
+            "# TYPE http_response_size_bytes histogram",
+        ]
+
+        for (route, method), hist in sorted(data["size"].items()):
+
+            lines += hist.render("http_response_size_bytes", f'route="{_esc(route)}",method="{method}"')
+
+        if data["steps"]:
+
+            lines += [
+
+                "# HELP app_step_duration_seconds Duration of instrumented steps inside handlers.",
+
+                "# TYPE app_step_duration_seconds histogram",
+            ]
+
+            for step, hist in sorted(data["steps"].items()):
+
+                lines += hist.render("app_step_duration_seconds", f'step="{_esc(step)}"')
+
+        return "\n".join(lines) + "\n"
+
+
+def _counting(body, counter: list[int]) -> Iterator[bytes]:     # 스트리밍 본문 크기를 보내면서 센다
+
+    for chunk in body:
+
+        counter[0] += len(chunk)
+
+        yield chunk
+
+
+def install_metrics(app: Flask, path: str = "/metrics") -> Metrics:
+
+    """app에 계측 훅과 /metrics 라우트를 붙이고 Metrics 객체를 돌려준다"""
+
+    metrics = Metrics(os.environ.get(METRICS_DIR_ENV) or None)
+
+    @app.before_request
+    def _start_timer():
+
+        g._metrics_t0 = time.perf_counter()
+
+
+    @app.after_request
+    def _record(response: Response) -> Response:
+
+        t0 = g.pop("_metrics_t0", None)
+
+        if t0 is None or request.path == path:
+
+            return response
+
+        route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+
+        method = request.method
+
+        status = response.status_code
+
+        if response.is_streamed:
+
+            size = [0]
+
+            response.response = _counting(response.response, size)
+
+        else:
+
+            size = [response.calculate_content_length() or 0]
+
+        # call_on_close는 본문을 다 보낸 뒤 호출되므로 스트리밍 응답도 마지막 바이트까지의 시간이 잡힌다
+        response.call_on_close(lambda: metrics.observe_request(route, method, status, time.perf_counter() - t0, size[0]))
+
+        return response
+
+
+    @app.route(path)
+    def _metrics_endpoint():
+
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+    return metrics
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import gzip
+
+import hashlib
+
+import threading
+
+import time
+
+from flask import Flask, Response, render_template, request
+
+try:        # brotli는 선택 의존성: 설치돼 있으면 br도 미리 압축해 둔다
+    import brotli
+except ImportError:
+    brotli = None
+
+# 정적인 템플릿 페이지용 렌더링 결과 캐시
+#   (템플릿 이름, context) → 렌더링된 bytes + 미리 압축한 gzip/br 본문 + 강한 ETag
+#   템플릿 파일이 바뀌면(Jinja loader의 uptodate) 다시 렌더링, 확인은 check_interval초에 한 번만
+#   요청마다 Accept-Encoding으로 본문을 고르고 If-None-Match가 맞으면 304
+
+
+class _Entry:
+
+    def __init__(self, body: bytes, uptodate):
+
+        self.uptodate = uptodate
+
+        self.checked = time.monotonic()
+
+        digest = hashlib.sha256(body).hexdigest()[:32]
+
+        self.bodies = {"identity": body}
+
+        if len(body) >= PageCache.min_size:
+
+            self.bodies["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+
+            if brotli is not None:
+
+                self.bodies["br"] = brotli.compress(body)
+
+        # 인코딩마다 바이트가 다르므로 ETag도 인코딩별로 다르게 (강한 ETag 규칙)
+        self.etags = {enc: f"{digest}-{enc}" if enc != "identity" else digest for enc in self.bodies}
+
+
+class PageCache:
+
+    min_size = 256      # 이보다 작은 페이지는 압축 이득이 없어 원문만 보관
+
+    def __init__(self, app: Flask, check_interval: float = 1.0):
+
+        self.app = app
+
+        self.check_interval = check_interval
+
+        self._entries: dict[tuple, _Entry] = {}
+
+        self._lock = threading.Lock()
+
+        # 다시 렌더링할 때 Jinja 자체 캐시의 옛 템플릿이 나오지 않도록 (렌더링은 변경 시에만 하므로 비용 없음)
+        app.jinja_env.auto_reload = True
+
+
+    def _build(self, template_name: str, context: dict) -> _Entry:
+
+        env = self.app.jinja_env
+
+        _, _, uptodate = env.loader.get_source(env, template_name)
+
+        body = render_template(template_name, **context).encode("utf-8")
+
+        return _Entry(body, uptodate or (lambda: True))
+
+
+    def _entry(self, template_name: str, context: dict) -> _Entry:
+
+        key = (template_name, tuple(sorted(context.items())))
+
+        entry = self._entries.get(key)
+
+        now = time.monotonic()
+
+        if entry is not None and now - entry.checked < self.check_interval:
+
+            return entry
+
+        if entry is not None and entry.uptodate():
+
+            entry.checked = now
+
+            return entry
+
+        with self._lock:        # 동시에 여러 요청이 와도 렌더링은 한 번
+
+            entry = self._entries.get(key)
+
+            if entry is None or (time.monotonic() - entry.checked >= self.check_interval and not entry.uptodate()):
+
+                entry = self._entries[key] = self._build(template_name, context)
+
+        return entry
+
+
+    def render(self, template_name: str, **context) -> Response:
+
+        """render_template 대신 사용. context 값은 해시 가능해야 한다(캐시 키)"""
+
+        entry = self._entry(template_name, context)
+
+        enc = request.accept_encodings.best_match(list(entry.bodies), default="identity")
+
+        etag = entry.etags[enc]
+
+        headers = {"Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+
+        if request.if_none_match.contains(etag):
+
+            resp = Response(status=304, headers=headers)
+
+        else:
+
+            resp = Response(entry.bodies[enc], mimetype="text/html", headers=headers)
+
+            if enc != "identity":
+
+                resp.headers["Content-Encoding"] = enc
+
+        resp.set_etag(etag)
+
+        return resp
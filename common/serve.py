@@ -0,0 +1,680 @@
+from __future__ import annotations
+
+import importlib
+
+import importlib.util
+
+import io
+
+import os
+
+import selectors
+
+import shutil
+
+import signal
+
+import socket
+
+import sys
+
+import tempfile
+
+import threading
+
+import time
+
+import traceback
+
+from collections import deque
+
+from concurrent.futures import ThreadPoolExecutor
+
+from pathlib import Path
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+from common.flask_metrics import METRICS_DIR_ENV
+
+# 운영용 실행기: app.run()(개발 서버, 단일 프로세스) 대신
+#   마스터가 앱을 한 번 import → 리슨 소켓을 열고 → worker 프로세스를 fork
+#   각 worker는 같은 소켓에서 accept하고 고정 크기 스레드 풀로 요청 처리 (HTTP/1.1 keep-alive)
+#   요청 사이에 조용한 keep-alive 연결은 스레드를 잡지 않고 selector 스레드가 맡아 두었다가 다음 요청이 오면 풀로 보냄
+# fork 전에 import하므로 코드/템플릿 캐시 등은 copy-on-write로 worker들이 공유한다.
+#
+#   python -m common.serve "main-1.3/app.py" --workers 4 --threads 8 --port 8000
+#
+# 신호: SIGTERM/SIGINT → 처리 중인 요청을 끝내고 종료, SIGHUP → 앱 재로딩 후 worker 교체(graceful reload)
+#   재로딩은 앱 폴더와 common 아래 모듈을 sys.modules에서 지우고 다시 import (같은 폴더의 tts_cache 등도 새 코드로)
+#   common.serve 자신과 설치된 패키지(flask 등)는 다시 읽지 않으므로 이 파일을 고쳤으면 프로세스를 재시작해야 한다.
+#
+# worker마다 메모리가 따로라서:
+#   - /metrics: 마스터가 만든 임시 폴더(METRICS_DIR)에 worker들이 집계를 저장 → 어느 worker가 받아도 전체 합계
+#   - TTS single-flight: 프로세스 안에서는 조각을 공유, 프로세스 사이에는 디스크 캐시 옆 잠금 파일로 합성 1번
+
+
+_COMMON_DIR = Path(__file__).resolve().parent
+
+
+def _evict_local_modules(app_dir: Path) -> None:
+
+    """앱 폴더/common 아래에서 읽은 모듈을 sys.modules에서 지움 → 다음 import가 파일을 다시 읽음"""
+
+    roots = (app_dir, _COMMON_DIR)
+
+    for name, module in list(sys.modules.items()):
+
+        file = getattr(module, "__file__", None)
+
+        if not file or name == __name__ or "site-packages" in file:
+
+            continue
+
+        file = Path(file).resolve()
+
+        if any(root == file.parent or root in file.parents for root in roots):
+
+            del sys.modules[name]
+
+
+def load_app(spec: str):
+
+    """'경로/app.py' 또는 '경로/app.py:변수명' → Flask 앱 (공용 앱 팩토리)
+
+    앱 폴더를 sys.path 앞에 넣어 같은 폴더 모듈(tts_cache 등) import가 그대로 동작하게 하고,
+    운영 모드이므로 debug는 끈다. 이미 읽은 앱 폴더/common 모듈은 버리고 새로 import 한다(SIGHUP 재로딩).
+    """
+
+    path, _, attr = spec.partition(":")
+
+    path = Path(path).resolve()
+
+    _evict_local_modules(path.parent)
+
+    app_dir = str(path.parent)
+
+    if app_dir not in sys.path:
+
+        sys.path.insert(0, app_dir)
+
+    name = f"_served_{abs(hash(str(path)))}"
+
+    module_spec = importlib.util.spec_from_file_location(name, path)
+
+    module = importlib.util.module_from_spec(module_spec)
+
+    sys.modules[name] = module
+
+    module_spec.loader.exec_module(module)
+
+    app = getattr(module, attr or "app")
+
+    app.debug = False
+
+    return app
+
+
+class _KeepAliveHandler(WSGIRequestHandler):
+
+    """HTTP/1.1 keep-alive 처리기
+
+    werkzeug의 run_wsgi는 응답마다 Connection: close를 붙이고, 응답 뒤 소켓에 남은 데이터를
+    읽어 버린다(연결을 유지하면 다음 요청 줄까지 버려짐). 그래서 요청 본문을 먼저 메모리로 읽어
+    rfile을 바꿔 두고(정리는 이 버퍼에서만 일어남) close 헤더를 빼서 같은 연결로 다음 요청을 받는다.
+    본문 길이를 모르는 요청(chunked, Expect, 너무 큰 본문)은 기존처럼 응답 후 연결을 닫는다.
+
+    응답 뒤 다음 요청이 이미 와 있지 않으면(파이프라이닝이 아니면) 기다리지 않고 parked를 세워
+    끝낸다 → 서버가 소켓을 _IdleConnections에 맡기고 풀 스레드는 바로 다른 연결을 처리한다.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    timeout = 5         # keep-alive 연결이 이 시간(초) 동안 조용하면 닫음 (요청을 읽는 도중의 제한도 같은 값)
+
+    access_log = False
+
+    max_buffered_body = 1 << 20
+
+    _keep_alive = False
+
+    parked = False
+
+
+    def _can_keep_alive(self) -> bool:
+
+        if self.close_connection or self.request_version != "HTTP/1.1":     # 클라이언트가 close 요청 / HTTP/1.0
+
+            return False
+
+        if "Transfer-Encoding" in self.headers or "Expect" in self.headers:
+
+            return False
+
+        try:
+
+            length = int(self.headers.get("Content-Length") or 0)
+
+        except ValueError:
+
+            return False
+
+        return 0 <= length <= self.max_buffered_body
+
+
+    def run_wsgi(self) -> None:
+
+        self._keep_alive = self._can_keep_alive()
+
+        if not self._keep_alive:
+
+            return super().run_wsgi()
+
+        sock_rfile = self.rfile
+
+        length = int(self.headers.get("Content-Length") or 0)
+
+        self.rfile = io.BytesIO(sock_rfile.read(length) if length else b"")
+
+        try:
+
+            super().run_wsgi()
+
+        finally:
+
+            self.rfile = sock_rfile
+
+            self._keep_alive = False
+
+
+    def handle_one_request(self) -> None:
+
+        super().handle_one_request()
+
+        if not self.close_connection and not self._next_request_waiting():
+
+            self.parked = True
+
+            self.close_connection = True        # 이 스레드의 요청 루프는 끝내고 연결은 서버가 보관
+
+
+    def _next_request_waiting(self) -> bool:
+
+        """버퍼나 소켓에 다음 요청 바이트가 이미 있는지 (기다리지 않고 확인)"""
+
+        self.connection.settimeout(0)
+
+        try:
+
+            return bool(self.rfile.peek(1))
+
+        except OSError:
+
+            return False
+
+        finally:
+
+            self.connection.settimeout(self.timeout)
+
+
+    def send_header(self, keyword, value) -> None:
+
+        if self._keep_alive and keyword.lower() == "connection" and value.lower() == "close":
+
+            return      # HTTP/1.1은 Connection 헤더가 없으면 연결 유지
+
+        super().send_header(keyword, value)
+
+
+    def log_request(self, code="-", size="-"):
+
+        if self.access_log:
+
+            super().log_request(code, size)
+
+
+    def log_error(self, format, *args):
+
+        if not format.startswith("Request timed out"):     # keep-alive 유휴 종료는 정상 동작
+
+            super().log_error(format, *args)
+
+
+class _IdleConnections:
+
+    """요청 사이에 조용한 keep-alive 연결 보관소
+
+    selector 스레드 하나가 맡아 둔 소켓들을 기다리다가 읽을 데이터(다음 요청 또는 종료)가 오면
+    서버의 스레드 풀에 다시 넣고, timeout 동안 조용하면 닫는다. 유휴 연결은 스레드가 아니라 fd만 쓴다.
+    """
+
+    def __init__(self, server: "PooledWSGIServer", timeout: float):
+
+        self._server = server
+
+        self._timeout = timeout
+
+        self._sel = selectors.DefaultSelector()
+
+        self._wake_r, self._wake_w = socket.socketpair()
+
+        self._wake_r.setblocking(False)
+
+        self._wake_w.setblocking(False)
+
+        self._sel.register(self._wake_r, selectors.EVENT_READ)
+
+        self._incoming: deque = deque()       # 풀 스레드 → selector 스레드 (register는 selector 스레드에서만)
+
+        self._deadlines: dict = {}            # 소켓 → (닫을 시각, 주소)
+
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._loop, name="wsgi-idle", daemon=True)
+
+        self._thread.start()
+
+
+    def park(self, sock, client_address) -> bool:
+
+        """맡았으면 True, 종료 중이라 못 맡으면 False(호출한 쪽이 닫음)"""
+
+        if self._closed:
+
+            return False
+
+        self._incoming.append((sock, client_address))
+
+        self._wake()
+
+        return True
+
+
+    def _wake(self) -> None:
+
+        try:
+
+            self._wake_w.send(b"\0")
+
+        except (BlockingIOError, OSError):      # 이미 깨울 신호가 쌓여 있음 / 닫는 중
+
+            pass
+
+
+    def _loop(self) -> None:
+
+        while not self._closed:
+
+            now = time.monotonic()
+
+            wait = min((d for d, _ in self._deadlines.values()), default=now + 1.0) - now
+
+            for key, _ in self._sel.select(max(wait, 0)):
+
+                if key.fileobj is self._wake_r:
+
+                    try:
+
+                        while self._wake_r.recv(4096):
+
+                            pass
+
+                    except BlockingIOError:
+
+                        pass
+
+                    continue
+
+                self._sel.unregister(key.fileobj)
+
+                _, addr = self._deadlines.pop(key.fileobj)
+
+                self._server.dispatch(key.fileobj, addr)
+
+            while self._incoming:
+
+                sock, addr = self._incoming.popleft()
+
+                self._sel.register(sock, selectors.EVENT_READ)
+
+                self._deadlines[sock] = (time.monotonic() + self._timeout, addr)
+
+            now = time.monotonic()
+
+            for sock, (deadline, _) in list(self._deadlines.items()):
+
+                if deadline <= now:
+
+                    self._sel.unregister(sock)
+
+                    del self._deadlines[sock]
+
+                    self._server.shutdown_request(sock)
+
+
+    def close(self) -> None:
+
+        """맡아 둔 유휴 연결을 모두 닫음 (처리 중인 요청과는 무관)"""
+
+        self._closed = True
+
+        self._wake()
+
+        self._thread.join()
+
+        for sock in list(self._deadlines):
+
+            self._server.shutdown_request(sock)
+
+        while self._incoming:
+
+            self._server.shutdown_request(self._incoming.popleft()[0])
+
+        self._sel.close()
+
+        self._wake_r.close()
+
+        self._wake_w.close()
+
+
+class PooledWSGIServer(BaseWSGIServer):
+
+    """연결마다 스레드를 새로 만들지 않고 고정 크기 스레드 풀에서 처리하는 WSGI 서버
+
+    풀 작업 하나 = 연결의 요청 한 번(+이미 도착한 파이프라인 요청). keep-alive 연결은 요청 사이에
+    _IdleConnections로 넘겨서, 유휴 브라우저가 몇 개든 풀 스레드는 실제 요청 처리에만 쓰인다.
+    """
+
+    multithread = True
+
+    daemon_threads = False
+
+
+    def __init__(self, host: str, port: int, app, threads: int = 8, fd: int | None = None):
+
+        super().__init__(host, port, app, handler=_KeepAliveHandler, fd=fd)
+
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="wsgi")
+
+        self._idle = _IdleConnections(self, self.RequestHandlerClass.timeout)
+
+
+    def process_request(self, request, client_address):
+
+        self.dispatch(request, client_address)
+
+
+    def dispatch(self, request, client_address) -> None:
+
+        try:
+
+            self._pool.submit(self._process_in_pool, request, client_address)
+
+        except RuntimeError:        # 풀이 이미 종료됨
+
+            self.shutdown_request(request)
+
+
+    def _process_in_pool(self, request, client_address):
+
+        parked = False
+
+        try:
+
+            parked = self.RequestHandlerClass(request, client_address, self).parked
+
+        except Exception:
+
+            self.handle_error(request, client_address)
+
+        if not (parked and self._idle.park(request, client_address)):
+
+            self.shutdown_request(request)
+
+
+    def close_idle(self) -> None:
+
+        self._idle.close()
+
+
+def _run_worker(listen_sock: socket.socket, app, threads: int) -> None:
+
+    host, port = listen_sock.getsockname()[:2]
+
+    server = PooledWSGIServer(host, port, app, threads=threads, fd=listen_sock.fileno())
+
+    # 터미널 Ctrl+C는 마스터가 받아서 SIGTERM으로 정리하므로 worker는 무시
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown, daemon=True).start())
+
+    try:
+
+        server.serve_forever()
+
+    finally:
+
+        server.server_close()
+
+        server.close_idle()         # 요청 사이에 쉬고 있던 keep-alive 연결은 바로 닫음
+
+        server._pool.shutdown(wait=True)      # 처리 중이던 요청은 끝까지 마친다
+
+        # 마지막 집계를 공유 폴더에 남김 (재로딩으로 모듈이 새로 읽혔을 수 있어 지금의 모듈에서 찾음)
+        importlib.import_module("common.flask_metrics").flush_all()
+
+
+class PreforkServer:
+
+    def __init__(self, spec: str, host: str = "0.0.0.0", port: int = 8000,
+                 workers: int | None = None, threads: int = 8):
+
+        self.spec = spec
+
+        self.host = host
+
+        self.port = port
+
+        self.workers = workers or os.cpu_count() or 1
+
+        self.threads = threads
+
+        self._children: set[int] = set()
+
+        self._retiring: set[int] = set()
+
+        self._stopping = False
+
+        self._reload = False
+
+
+    def _spawn(self, app) -> None:
+
+        pid = os.fork()
+
+        if pid == 0:
+
+            code = 0
+
+            try:
+
+                _run_worker(self._sock, app, self.threads)
+
+            except BaseException:
+
+                traceback.print_exc()
+
+                code = 1
+
+            finally:
+
+                os._exit(code)
+
+        self._children.add(pid)
+
+
+    def _signal_all(self, pids, sig) -> None:
+
+        for pid in pids:
+
+            try:
+
+                os.kill(pid, sig)
+
+            except ProcessLookupError:
+
+                pass
+
+
+    def _reap(self) -> set[int]:
+
+        exited = set()
+
+        while True:
+
+            try:
+
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+
+            except ChildProcessError:
+
+                break
+
+            if pid == 0:
+
+                break
+
+            exited.add(pid)
+
+        return exited
+
+
+    def serve(self) -> None:
+
+        self._sock = socket.create_server((self.host, self.port), backlog=2048)
+
+        self._sock.set_inheritable(True)
+
+        own_metrics_dir = not os.environ.get(METRICS_DIR_ENV)
+
+        if own_metrics_dir:     # 앱 import(install_metrics) 전에 정해야 worker들이 같은 폴더를 씀
+
+            os.environ[METRICS_DIR_ENV] = tempfile.mkdtemp(prefix="serve-metrics-")
+
+        app = load_app(self.spec)       # fork 전에 한 번만 import
+
+        print(f"[serve] {self.spec} on http://{self.host}:{self.port} "
+              f"({self.workers} workers x {self.threads} threads, pid {os.getpid()})")
+
+        signal.signal(signal.SIGTERM, lambda *_: setattr(self, "_stopping", True))
+
+        signal.signal(signal.SIGINT, lambda *_: setattr(self, "_stopping", True))
+
+        signal.signal(signal.SIGHUP, lambda *_: setattr(self, "_reload", True))
+
+        for _ in range(self.workers):
+
+            self._spawn(app)
+
+        while not self._stopping:
+
+            time.sleep(0.2)
+
+            if self._reload:
+
+                self._reload = False
+
+                try:
+
+                    app = load_app(self.spec)
+
+                except Exception as e:      # 새 코드가 깨져 있으면 기존 worker를 그대로 유지
+
+                    print(f"[serve] 재로딩 실패, 기존 worker 유지: {e}")
+
+                    continue
+
+                old = set(self._children)
+
+                self._retiring |= old
+
+                self._children -= old
+
+                for _ in range(self.workers):
+
+                    self._spawn(app)
+
+                self._signal_all(old, signal.SIGTERM)
+
+                print(f"[serve] 재로딩 완료 (worker {len(old)}개 교체)")
+
+            for pid in self._reap():
+
+                if pid in self._retiring:
+
+                    self._retiring.discard(pid)
+
+                elif pid in self._children:       # 예상치 못하게 죽은 worker는 다시 띄움
+
+                    self._children.discard(pid)
+
+                    if not self._stopping:
+
+                        time.sleep(0.5)      # 시작하자마자 죽는 worker가 fork를 폭주시키지 않도록
+
+                        self._spawn(app)
+
+        self._signal_all(self._children | self._retiring, signal.SIGTERM)
+
+        for pid in self._children | self._retiring:
+
+            try:
+
+                os.waitpid(pid, 0)
+
+            except ChildProcessError:
+
+                pass
+
+        self._sock.close()
+
+        if own_metrics_dir:
+
+            shutil.rmtree(os.environ.pop(METRICS_DIR_ENV), ignore_errors=True)
+
+
+def main() -> int:
+
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Flask 앱 운영 모드 실행기 (prefork + 스레드 풀)")
+
+    ap.add_argument("app", help="앱 파일 경로, 예) main-1.3/app.py 또는 3/david/app.py:app")
+
+    ap.add_argument("--host", default="0.0.0.0")
+
+    ap.add_argument("--port", type=int, default=8000)
+
+    ap.add_argument("--workers", type=int, default=None, help="worker 프로세스 수 (기본: CPU 코어 수)")
+
+    ap.add_argument("--threads", type=int, default=8, help="worker당 스레드 풀 크기")
+
+    ap.add_argument("--keepalive", type=float, default=5.0, help="keep-alive 유휴 제한(초)")
+
+    ap.add_argument("--access-log", action="store_true", help="요청마다 접근 로그 출력")
+
+    args = ap.parse_args()
+
+    _KeepAliveHandler.timeout = args.keepalive
+
+    _KeepAliveHandler.access_log = args.access_log
+
+    PreforkServer(args.app, args.host, args.port, args.workers, args.threads).serve()
+
+    return 0
+
+
+if __name__ == "__main__":
+
+    raise SystemExit(main())
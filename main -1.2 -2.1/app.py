@@ -1,14 +1,21 @@
-from flask import Flask, render_template
+from flask import Flask
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.flask_metrics import install_metrics
+from common.page_cache import PageCache
 
 app = Flask(__name__)
+metrics = install_metrics(app)
+pages = PageCache(app)
 
 @app.route("/")
 def home():
-    return render_template("menu.html")
+    return pages.render("menu.html")
 
 @app.route("/menu")
 def menu():
-    return render_template("menu.html")
+    return pages.render("menu.html")
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=8080)
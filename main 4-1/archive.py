@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import hashlib, json, os
+
+from datetime import datetime
+
+from pathlib import Path
+
+from typing import Any, Iterator
+
+# 분석 결과 보관소 (실행마다 전체 JSON을 새로 쓰는 대신)
+#
+#   archive/chunks/ab/<sha256>.json   내용의 sha256이 이름인 객체 → 같은 내용은 한 번만 저장
+#       레코드 묶음(chunk)   {"fields": [...], "rows": [[...], ...]}
+#       목록 노드            {"level": n, "refs": [아래 단계 해시, ...]}   chunk 해시 목록을 묶은 트리
+#   archive/runs/<run>.json           실행별 작은 manifest: 트리 뿌리 해시 + 위험 레코드 위치 + 원본 순번(orig_idx)
+#
+# chunk 경계는 레코드 내용의 해시로 정한다(content-defined). 앞쪽에 로그 몇 줄이 더해져도
+# 그 주변 chunk만 새로 생기고 나머지는 이전 실행과 같은 해시가 되어 재사용된다.
+# chunk 해시 목록도 같은 방식으로 묶어 트리로 저장하므로, 같은 로그를 다시 보관하면 새로 쓰는 것은 manifest 하나뿐이다.
+# 실행마다 달라지는 원본 순번은 chunk에 넣지 않고 manifest에 (시작, 개수, 간격) 구간으로 둔다.
+# 공용 색인은 없다: 검색은 manifest에서 트리를 내려가며 고유 노드/chunk를 한 번씩만 읽는다.
+
+BOUNDARY_MASK = 0x1F        # 해시 하위 비트가 0이면 경계 → 평균 32개씩
+
+MAX_CHUNK = 256
+
+def _dumps(obj: Any) -> bytes:
+
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def _write_atomic(path: Path, data: bytes) -> None:
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp = path.with_name(path.name + ".tmp")
+
+    tmp.write_bytes(data)
+
+    os.replace(tmp, path)
+
+def _split(items: list, boundary) -> list[list]:
+
+    groups, cur = [], []
+
+    for x in items:
+
+        cur.append(x)
+
+        if boundary(x) or len(cur) >= MAX_CHUNK:
+
+            groups.append(cur); cur = []
+
+    if cur: groups.append(cur)
+
+    return groups
+
+def split_chunks(rows: list[tuple | list]) -> list[list[tuple | list]]:
+
+    return _split(rows, lambda r: (hashlib.sha256(_dumps(r)).digest()[-1] & BOUNDARY_MASK) == 0)
+
+def to_ranges(values: list[int]) -> list[list[int]]:
+
+    """[9, 8, 7, 2] → [[9, 3, -1], [2, 1, 0]]  (시작, 개수, 간격) — timestamp 역순이면 구간 하나"""
+
+    out: list[list[int]] = []
+
+    for v in values:
+
+        if out:
+
+            r = out[-1]
+
+            if r[1] == 1:
+
+                r[1], r[2] = 2, v - r[0]; continue
+
+            if v == r[0] + r[1] * r[2]:
+
+                r[1] += 1; continue
+
+        out.append([v, 1, 0])
+
+    return out
+
+def from_ranges(ranges: list[list[int]]) -> list[int]:
+
+    return [start + k * step for start, n, step in ranges for k in range(n)]
+
+class Archive:
+
+    def __init__(self, root: Path):
+
+        self.root = Path(root)
+
+    def _object_path(self, h: str) -> Path:
+
+        return self.root / "chunks" / h[:2] / f"{h}.json"
+
+    def _put(self, obj: Any) -> tuple[str, bool]:
+
+        """(해시, 새로 저장했는지)"""
+
+        data = _dumps(obj)
+
+        h = hashlib.sha256(data).hexdigest()
+
+        p = self._object_path(h)
+
+        if p.exists(): return h, False
+
+        _write_atomic(p, data)
+
+        return h, True
+
+    def _get(self, h: str) -> Any:
+
+        return json.loads(self._object_path(h).read_bytes())
+
+    def put_chunk(self, fields: list[str], rows: list[tuple | list]) -> tuple[str, bool]:
+
+        return self._put({"fields": fields, "rows": rows})
+
+    def get_chunk(self, h: str) -> list[dict[str, Any]]:
+
+        chunk = self._get(h)
+
+        fields = chunk["fields"]
+
+        return [dict(zip(fields, r)) for r in chunk["rows"]]
+
+    def _put_tree(self, hashes: list[str]) -> tuple[str | None, int, int]:
+
+        """chunk 해시 목록 → (뿌리 해시, 깊이, 새로 저장한 노드 수). 깊이 0이면 뿌리가 곧 chunk"""
+
+        depth, new = 0, 0
+
+        while len(hashes) > 1:
+
+            depth += 1
+
+            level = []
+
+            for refs in _split(hashes, lambda h: (int(h[-2:], 16) & BOUNDARY_MASK) == 0):
+
+                h, created = self._put({"level": depth, "refs": refs})
+
+                level.append(h); new += created
+
+            hashes = level
+
+        return (hashes[0] if hashes else None), depth, new
+
+    def _leaves(self, root: str | None, depth: int) -> list[str]:
+
+        hashes = [root] if root else []
+
+        for _ in range(depth):
+
+            hashes = [h for node in hashes for h in self._get(node)["refs"]]
+
+        return hashes
+
+    def store_run(self, fields: list[str], rows: list[tuple | list], risk_positions: list[int], *,
+                  orig_idx: list[int] | None = None, source: str = "") -> dict[str, Any]:
+
+        """정렬된 행(fields 순서의 값 tuple) 목록을 chunk로 저장하고 manifest를 남긴다. manifest(+통계) 반환"""
+
+        run = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+        n = 1
+
+        while (self.root / "runs" / f"{run}.json").exists():
+
+            n += 1; run = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{n}"
+
+        hashes, new = [], 0
+
+        for chunk in split_chunks(rows):
+
+            h, created = self.put_chunk(fields, chunk)
+
+            hashes.append(h); new += created
+
+        root, depth, new_nodes = self._put_tree(hashes)
+
+        manifest = {"run": run, "created": datetime.now().isoformat(timespec="seconds"), "source": source,
+
+                    "records": len(rows), "root": root, "depth": depth, "risk": to_ranges(risk_positions)}
+
+        if orig_idx is not None: manifest["orig_idx"] = to_ranges(orig_idx)
+
+        _write_atomic(self.root / "runs" / f"{run}.json", _dumps(manifest))     # 객체를 모두 쓴 뒤 마지막에 → 없는 객체를 가리키지 않음
+
+        return {**manifest, "chunks": hashes, "new_chunks": new, "new_nodes": new_nodes}
+
+    def runs(self) -> list[str]:
+
+        return sorted(p.stem for p in (self.root / "runs").glob("*.json"))
+
+    def _manifest(self, run: str) -> dict[str, Any]:
+
+        return json.loads((self.root / "runs" / f"{run}.json").read_bytes())
+
+    def load_run(self, run: str) -> tuple[dict[int, dict[str, Any]], list[dict[str, Any]]]:
+
+        """(1-base 인덱스 dict, 위험 레코드 목록) — 기존 결과 JSON 두 개와 같은 내용"""
+
+        manifest = self._manifest(run)
+
+        rows = [r for h in self._leaves(manifest["root"], manifest["depth"]) for r in self.get_chunk(h)]
+
+        for r, i in zip(rows, from_ranges(manifest.get("orig_idx", []))): r["orig_idx"] = i
+
+        return {i: r for i, r in enumerate(rows, 1)}, [rows[i] for i in from_ranges(manifest["risk"])]
+
+    def _chunk_runs(self) -> dict[str, set[str]]:
+
+        """chunk 해시 → 그 chunk를 쓰는 실행들. 깊은 단계부터 노드마다 한 번씩 읽어 실행 목록을 자식에게 물려준다"""
+
+        by_depth: dict[int, dict[str, set[str]]] = {}
+
+        for run in self.runs():
+
+            m = self._manifest(run)
+
+            if m["root"]: by_depth.setdefault(m["depth"], {}).setdefault(m["root"], set()).add(run)
+
+        for depth in range(max(by_depth, default=0), 0, -1):
+
+            below = by_depth.setdefault(depth - 1, {})
+
+            for node, runs in by_depth.pop(depth, {}).items():
+
+                for h in self._get(node)["refs"]:
+
+                    below.setdefault(h, set()).update(runs)
+
+        return by_depth.get(0, {})
+
+    def search(self, query: str) -> Iterator[tuple[dict[str, Any], list[str]]]:
+
+        """모든 실행에서 부분 검색. 고유 chunk만 읽어 (레코드, 포함한 실행 목록)을 돌려준다"""
+
+        q = query.lower()
+
+        hits: dict[bytes, tuple[dict[str, Any], set[str]]] = {}        # 서로 다른 chunk에 들어간 같은 레코드는 실행 목록을 합침
+
+        for h, runs in self._chunk_runs().items():
+
+            for r in self.get_chunk(h):
+
+                if not any(isinstance(v, str) and q in v.lower() for v in r.values()): continue
+
+                hits.setdefault(_dumps(r), (r, set()))[1].update(runs)
+
+        for r, runs in hits.values():
+
+            yield r, sorted(runs)
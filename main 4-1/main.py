@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-import argparse, csv, json, re
+import argparse, json, re, sys
 
 from datetime import datetime
 
@@ -8,6 +8,12 @@ from pathlib import Path
 
 from typing import Any, Iterable
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))    # 저장소 루트의 common 패키지 사용
+
+from common.csv_ingest import Schema, read_rows
+
+from archive import Archive
+
 RISK_KEYWORDS = ("explosion", "누출", "고온", "Oxygen")
 
 def resolve_paths(log_arg: str | None, out_arg: str | None) -> tuple[Path, Path]:
@@ -20,26 +26,19 @@ def resolve_paths(log_arg: str | None, out_arg: str | None) -> tuple[Path, Path]
 
     return log, out
 
-def read_log_csv(path: Path) -> list[dict[str, Any]]:
+def read_log_csv(path: Path) -> tuple[list[str], list[tuple]]:
+
+    """(컬럼 이름, strip 된 행 tuple 목록). 원본 순번(orig_idx)은 목록 위치 + 1"""
 
     if not path.exists():
 
         raise FileNotFoundError(f"로그 파일 없음: {path}")
 
 
-    with path.open("r", encoding="utf-8-sig", newline="") as f:
-
-        rows: list[dict[str, Any]] = []
-
-        for i, row in enumerate(csv.DictReader(f), 1):
+    # 공용 파서가 행마다 만든 tuple을 그대로 쓴다 (행마다 dict를 다시 만들지 않음)
+    data = read_rows(path, Schema(strip=True), encoding="utf-8-sig")
 
-            rows.append({(k.strip() if isinstance(k,str) else k):
-
-                         (v.strip() if isinstance(v,str) else v)
-
-                         for k, v in row.items()} | {"orig_idx": i})
-
-    return rows
+    return data.names, data.rows
 
 def parse_ts(s: Any) -> datetime | None:
 
@@ -51,15 +50,23 @@ def parse_ts(s: Any) -> datetime | None:
 
     return None
 
-def sort_desc_by_timestamp(rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+def sort_desc_by_timestamp(names: list[str], rows: list[tuple]) -> list[int]:
+
+    """timestamp 역순으로 정렬한 행 위치(0-base) 목록"""
+
+    if "timestamp" not in names: return list(range(len(rows)))
 
-    key = lambda r: parse_ts(r.get("timestamp")) or datetime.min
+    col = names.index("timestamp")
 
-    return sorted(rows, key=key, reverse=True)
+    ts = [parse_ts(r[col] if col < len(r) else None) or datetime.min for r in rows]
 
-def list_to_indexed_dict(rows: list[dict[str, Any]]) -> dict[int, dict[str, Any]]:
+    return sorted(range(len(rows)), key=ts.__getitem__, reverse=True)
 
-    return {i: r for i, r in enumerate(rows, 1)}
+def record(names: list[str], row: tuple, orig_idx: int) -> dict[str, Any]:
+
+    """출력/저장하는 순간에만 만드는 레코드 dict (읽은 행은 tuple 그대로 둔다)"""
+
+    return dict(zip(names, row)) | {"orig_idx": orig_idx}
 
 #----------------------------- save -------------------------------------------
 
@@ -79,23 +86,39 @@ def timestamped_json_path(result_path: Path, *, stem: str) -> Path:
 
     return p / f"{stem}_{ts}.json"
 
-def save_json(data: dict[int, dict[str, Any]] | list[dict[str, Any]], out: Path) -> Path:
+def save_json(names: list[str], rows: list[tuple], order: list[int], out: Path, *, indexed: bool) -> Path:
+
+    """order 순서의 레코드를 1-base 인덱스 dict(indexed) 또는 list JSON으로 저장 (레코드 하나씩 써 나감)"""
+
+    with out.open("w", encoding="utf-8") as f:
+
+        f.write("{" if indexed else "[")
 
-    out.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+        for k, i in enumerate(order, 1):
+
+            text = json.dumps(record(names, rows[i], i + 1), ensure_ascii=False, indent=2).replace("\n", "\n  ")
+
+            f.write(("," if k > 1 else "") + "\n  " + (f'"{k}": ' if indexed else "") + text)
+
+        f.write(("\n" if order else "") + ("}" if indexed else "]"))
 
     return out
 
-def save_risk_only(rows: list[dict[str, Any]], out_dir: Path) -> Path:
+RISK_PAT = re.compile("|".join(re.escape(k) for k in RISK_KEYWORDS), re.IGNORECASE)
 
-    out_dir.mkdir(parents=True, exist_ok=True)
+def is_risk(row: Iterable[Any]) -> bool:
 
-    pat = re.compile("|".join(re.escape(k) for k in RISK_KEYWORDS), re.IGNORECASE)
+    return any(isinstance(v,str) and RISK_PAT.search(v) for v in row)
 
-    filt = [r for r in rows if any(isinstance(v,str) and pat.search(v) for v in r.values())]
+def save_risk_only(names: list[str], rows: list[tuple], order: list[int], out_dir: Path) -> Path:
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    filt = [i for i in order if is_risk(rows[i])]
 
     out = out_dir / f"risk_logs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
 
-    return save_json(filt, out)
+    return save_json(names, rows, filt, out, indexed=False)
 
 def search_in_json(json_path: Path, query: str) -> list[dict[str, Any]]:
 
@@ -123,15 +146,30 @@ def main() -> int:
 
     ap.add_argument("--search", default="", help="저장 JSON에서 부분 검색어")
 
+    ap.add_argument("--archive", action="store_true", help="전체 JSON 대신 <out>/archive 에 중복 없이 보관 (chunk + 실행별 manifest)")
+
+    ap.add_argument("--query", default="", help="보관된 모든 실행에서 부분 검색 (로그는 읽지 않음)")
+
     args = ap.parse_args()
 
+    if args.query.strip():
+
+        _, out_path = resolve_paths(args.log, args.out)
+
+        hits = list(Archive(out_path / "archive").search(args.query.strip()))
+
+        print(f"— 보관소 검색 결과({len(hits)}건) —")
+
+        for r, runs in hits[:200]: print(r, "| runs:", ", ".join(runs))
+
+        return 0
 
 
     log_path, out_path = resolve_paths(args.log, args.out)
 
     try:
 
-        rows = read_log_csv(log_path)
+        names, rows = read_log_csv(log_path)
 
     except (FileNotFoundError, UnicodeDecodeError) as e:
 
@@ -141,27 +179,45 @@ def main() -> int:
 
     print("— 원본 (전체) —")
 
-    for r in rows: print(r)
+    for i, r in enumerate(rows, 1): print(record(names, r, i))
 
-    sorted_rows = sort_desc_by_timestamp(rows)
+    order = sort_desc_by_timestamp(names, rows)
 
     print("\n— timestamp 역순 (전체) —")
 
-    for r in sorted_rows: print(r)
-
-    indexed = list_to_indexed_dict(sorted_rows)
+    for i in order: print(record(names, rows[i], i + 1))
 
     print("\n— 리스트→딕셔너리 1-base (전체) —")
 
-    for k, v in indexed.items(): print(k, ":", v)
+    for k, i in enumerate(order, 1): print(k, ":", record(names, rows[i], i + 1))
+
+    if args.archive:
+
+        info = Archive(out_path / "archive").store_run(names, [rows[i] for i in order], [k for k, i in enumerate(order) if is_risk(rows[i])],
+
+                                                       orig_idx=[i + 1 for i in order], source=str(log_path))
+
+        print(f"\n[OK] 보관: run {info['run']} (레코드 {info['records']}, chunk {len(info['chunks'])}, 새 chunk {info['new_chunks']})")
+
+        if args.search.strip():
+
+            q = args.search.strip().lower()
+
+            hits = [i for i in order if any(isinstance(v,str) and q in v.lower() for v in rows[i])]
+
+            print(f"— 검색 결과({len(hits)}건) —")
+
+            for i in hits[:200]: print(record(names, rows[i], i + 1))
+
+        return 0
 
     json_path = timestamped_json_path(out_path, stem=log_path.stem)
 
-    save_json(indexed, json_path)
+    save_json(names, rows, order, json_path, indexed=True)
 
     print(f"\n[OK] JSON 저장: {json_path}")
     
-    risk_path = save_risk_only(sorted_rows, json_path.parent)
+    risk_path = save_risk_only(names, rows, order, json_path.parent)
 
     print(f"[OK] 위험 로그 저장: {risk_path}")
 
@@ -6,8 +6,22 @@ from pathlib import Path
 
 import csv
 
+import hashlib
+
+import io
+
+import os
+
 import pickle
 
+import sys
+
+from operator import itemgetter
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))    # 저장소 루트의 common 패키지 사용
+
+from common.csv_ingest import Schema, read_rows
+
 
 SRC_CSV = Path('Mars_Base_Inventory_List.csv')
 
@@ -38,143 +52,392 @@ def _find_fi_key(header: List[str]) -> Optional[str]:
     return None
 
 
-def _fmt_float(x: Any) -> str:
+#파싱하여 행 tuple 목록으로 변환 후 인화성 지수 내림차순 정렬 출력
+#   행 = (strip한 원본 문자열 컬럼들..., _fi)  마지막 칸만 인화성 지수 float, 원본 컬럼 값은 문자열 그대로
+def read_inventory_csv(path: Path) -> Tuple[List[str], List[tuple], str]:
 
-    try:
+    if not path.exists():
+
+        raise FileNotFoundError(f'입력 CSV를 찾을 수 없습니다: {path}')
+
+    with path.open('r', encoding='utf-8', newline='') as f:
+
+        header = next(csv.reader(f), None)
+
+    if not header:
+
+        raise ValueError('CSV 헤더를 찾을 수 없습니다. 헤더를 포함해 주세요.')
+
+    fi_key = _find_fi_key(header)
+
+    if not fi_key:
+
+        raise KeyError('인화성 지수 컬럼을 찾을 수 없습니다. 가능한 헤더: '
+
+                       f"{', '.join(FI_CANDIDATE_KEYS)} 또는 '...flammability...' 포함 헤더")
+
+    fi_key = fi_key.strip()
 
-        return f'{float(x):.3f}'
+    # 공용 파서: strip + 인화성 지수 float(맨 뒤 _fi 칸)을 행 tuple 하나로, 변환 안 되는 행은 모아서 보고
+    data = read_rows(path, Schema(required=(fi_key,), derived={'_fi': (fi_key, float)}))
 
-    except Exception:
+    if data.rejected:
 
-        return str(x)
+        print(f'[경고] 인화성 지수를 읽을 수 없는 {len(data.rejected)}개 행 제외 '
 
+              f"(행 번호: {', '.join(str(r.line) for r in data.rejected[:10])}{' ...' if len(data.rejected) > 10 else ''})")
 
-#파싱하여 List[dict] 로 변환 후 인화성 지수 내림차순 정렬 출력
-def read_inventory_csv(path: Path) -> Tuple[List[Dict[str, Any]], str]:
+    return data.names, data.rows, fi_key
+
+
+def sort_by_fi_desc(rows: List[tuple]) -> List[tuple]:
+
+    return sorted(rows, key=itemgetter(-1), reverse=True)
+
+
+#인화성 지수 >= 0.7 만 필터링하여 별도 출력
+def filter_danger(rows: List[tuple], threshold: float = 0.7) -> List[tuple]:
+
+    return [r for r in rows if r[-1] >= threshold]
+
+
+# 증분 갱신: .bin 스냅샷을 pickle 프레임을 이어 붙이는 로그로 저장
+#   {'header': [...]} → ('put', 키, 해시, 행 tuple) / ('del', 키) ...   읽을 때 차례로 재생, 저장은 바뀐 행만 뒤에 추가
+#   키 = 첫 컬럼 값(같은 값이 다시 나오면 '#2', '#3' ...), 해시 = strip한 원본 필드 전체의 blake2b
+#   해시가 같은 행은 float 변환/위험 판정을 다시 하지 않는다.
+#   로그가 살아 있는 행보다 훨씬 길어지면 임시 파일에 전체를 쓰고 rename(압축)
+def _row_hash(values) -> bytes:
+
+    return hashlib.blake2b('\x1f'.join('' if v is None else v for v in values).encode('utf-8'), digest_size=16).digest()
+
+
+def load_snapshot(path: Path) -> Dict[str, Any]:
+
+    """{'header', 'rows': {키: (해시, 행)}, 'frames', 'end', 'legacy'} — frames < 0 이면 다음 저장 때 전체를 다시 씀"""
+
+    snap: Dict[str, Any] = {'header': None, 'rows': {}, 'frames': -1, 'end': 0, 'legacy': False}
 
     if not path.exists():
 
-        raise FileNotFoundError(f'입력 CSV를 찾을 수 없습니다: {path}')
+        return snap
 
-    rows: List[Dict[str, Any]] = []
+    with path.open('rb') as f:
 
-    with path.open('r', encoding='utf-8', newline='') as f:
+        try:
 
-        reader = csv.DictReader(f)
+            first = pickle.load(f)
 
-        if reader.fieldnames is None:
+        except (EOFError, pickle.UnpicklingError):
 
-            raise ValueError('CSV 헤더를 찾을 수 없습니다. 헤더를 포함해 주세요.')
+            return snap
 
-        fi_key = _find_fi_key(reader.fieldnames)
+        if isinstance(first, list):     # 이전 형식(인화성 지수 순으로 정렬된 dict 행 목록 통째로)
 
-        if not fi_key:
+            # 같은 이름 행의 CSV 순서를 알 수 없어 키('이름#2' ...)를 맞출 수 없음 → 비교 없이 전체 재작성
+            snap['legacy'] = True
 
-            raise KeyError('인화성 지수 컬럼을 찾을 수 없습니다. 가능한 헤더: '
+            return snap
 
-                           f"{', '.join(FI_CANDIDATE_KEYS)} 또는 '...flammability...' 포함 헤더")
+        snap['header'] = first.get('header')
 
-        for line in reader:
+        snap['frames'] = 0
 
-            line = {k: (v.strip() if isinstance(v, str) else v) for k, v in line.items()}
+        snap['end'] = f.tell()
+
+        rows = snap['rows']
+
+        while True:
 
             try:
 
-                line['_fi'] = float(line[fi_key])
+                frame = pickle.load(f)
 
-            except Exception:
+            except (EOFError, pickle.UnpicklingError):     # 저장 도중 끊긴 마지막 프레임은 버림 (end 뒤는 다음 저장 때 덮어씀)
 
-                continue
+                break
 
-            rows.append(line)
+            if frame[0] == 'put':
 
-    return rows, fi_key
+                rows[frame[1]] = (frame[2], frame[3])
 
+            else:
 
-def sort_by_fi_desc(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+                rows.pop(frame[1], None)
 
-    return sorted(rows, key=lambda d: d.get('_fi', -1.0), reverse=True)
+            snap['frames'] += 1
 
+            snap['end'] = f.tell()
 
-#인화성 지수 >= 0.7 만 필터링하여 별도 출력
-def filter_danger(rows: List[Dict[str, Any]], threshold: float = 0.7) -> List[Dict[str, Any]]:
+    return snap
 
-    return [r for r in rows if isinstance(r.get('_fi'), float) and r['_fi'] >= threshold]
 
+def _row_key(first: str, counts: Dict[str, int]) -> str:
 
-#Mars_Base_Inventory_danger.csv 저장
-def save_csv(path: Path, rows: List[Dict[str, Any]]) -> None:
+    n = counts[first] = counts.get(first, 0) + 1
 
-    if not rows:
+    return first if n == 1 else f'{first}#{n}'
 
-        with path.open('w', encoding='utf-8', newline='') as f:
 
-            f.write('')
+def save_snapshot(path: Path, snap: Dict[str, Any], puts: List[Tuple[str, bytes, tuple]],
+                  dels: List[str]) -> bool:
 
-        return
+    """snap['rows']에는 이미 반영된 변경을 로그 뒤에 추가. 전체를 다시 썼으면 True"""
+
+    rows = snap['rows']
+
+    frames = snap['frames'] + len(puts) + len(dels)
+
+    if snap['frames'] < 0 or frames > 2 * len(rows) + 64:
+
+        tmp = path.with_name(path.name + '.tmp')
+
+        with tmp.open('wb') as f:
+
+            pickle.dump({'header': snap['header']}, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+            for key, (h, row) in rows.items():
+
+                pickle.dump(('put', key, h, row), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+            f.flush()
+
+            os.fsync(f.fileno())
 
-    keys = [k for k in rows[0].keys() if k != '_fi']
+            snap['end'] = f.tell()
 
-    with path.open('w', encoding='utf-8', newline='') as f:
+        os.replace(tmp, path)
 
-        writer = csv.DictWriter(f, fieldnames=keys)
+        snap['frames'] = len(rows)
 
-        writer.writeheader()
+        return True
 
-        for r in rows:
+    if not puts and not dels:
 
-            out = {k: (f'{r[k]:.3f}' if isinstance(r.get(k), float) else r.get(k)) for k in keys}
-            #모든 수치 출력은 소수점 3자리까지
-            writer.writerow(out)
+        return False
 
+    buf = io.BytesIO()
 
-# 표준 라이브러리만 사용 (pickle 사용해 이진 저장)
-def save_binary(path: Path, data: Any) -> None:
+    for key in dels:
 
-    with path.open('wb') as f:     #write binary
+        pickle.dump(('del', key), buf, protocol=pickle.HIGHEST_PROTOCOL)
 
-        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    for key, h, row in puts:
 
-def load_binary(path: Path) -> Any:
+        pickle.dump(('put', key, h, row), buf, protocol=pickle.HIGHEST_PROTOCOL)
 
-    with path.open('rb') as f:      #read binary
+    with path.open('r+b') as f:
 
-        return pickle.load(f)
+        f.seek(snap['end'])
 
+        f.write(buf.getvalue())
 
-def print_table(rows: List[Dict[str, Any]], fi_key: str) -> None:
+        f.truncate()
+
+        f.flush()
+
+        os.fsync(f.fileno())
+
+        snap['end'] = f.tell()
+
+    snap['frames'] = frames
+
+    return False
+
+
+def _csv_lines(names: List[str], rows: List[tuple]) -> List[bytes]:
 
     if not rows:
 
-        print('[정보] 출력할 데이터가 없습니다.')
+        return []
+
+    buf = io.StringIO()
+
+    writer = csv.writer(buf)
+
+    lines = []
+
+    for values in [names[:-1]] + [r[:-1] for r in rows]:
+
+        writer.writerow(values)
+
+        lines.append(buf.getvalue().encode('utf-8'))
+
+        buf.seek(0)
+
+        buf.truncate()
+
+    return lines
+
+
+def patch_csv(path: Path, names: List[str], rows: List[tuple]) -> int:
+
+    """위험 CSV(원본 문자열 그대로, _fi 칸 제외)를 기존 파일과 처음 달라지는 줄부터만 다시 씀. 다시 쓴 줄 수 반환"""
+
+    lines = _csv_lines(names, rows)
+
+    if not path.exists():
+
+        path.write_bytes(b'')
+
+    with path.open('r+b') as f:
+
+        offset = 0
+
+        same = 0
+
+        for old in f:
+
+            if same >= len(lines) or old != lines[same]:
+
+                break
+
+            offset += len(old)
+
+            same += 1
+
+        f.seek(offset)
+
+        f.write(b''.join(lines[same:]))
+
+        f.truncate()
+
+    return len(lines) - same
+
+
+def update_incremental(names: List[str], rows: List[tuple], danger_path: Path, bin_path: Path,
+                       threshold: float = 0.7) -> Dict[str, Any]:
+
+    """read_inventory_csv로 읽은 행을 스냅샷과 행 해시로 비교해 바뀐 행만 반영하고, 스냅샷/위험 CSV를 패치"""
+
+    snap = load_snapshot(bin_path)
+
+    header = names[:-1]
+
+    rebuilt = snap['legacy']        # 이전 형식 스냅샷: 변경 보고 없이 전체 재작성
+
+    if header != snap['header']:        # 컬럼 구성이 바뀌면 모든 행을 새로 계산하고 전체 저장
+
+        snap = {'header': header, 'rows': {}, 'frames': -1, 'end': 0, 'previous': snap['rows']}
+
+    old_rows = snap['rows']
+
+    seen = set()
+
+    counts: Dict[str, int] = {}
+
+    puts: List[Tuple[str, bytes, tuple]] = []
+
+    for row in rows:
+
+        key = _row_key(row[0] or '', counts)
+
+        h = _row_hash(row[:-1])
+
+        seen.add(key)
+
+        old = old_rows.get(key)
+
+        if old is None or old[0] != h:
+
+            puts.append((key, h, row))
+
+    previous = snap.pop('previous', old_rows)
+
+    dels = [k for k in old_rows if k not in seen]
+
+    report: Dict[str, Any] = {'names': names, 'rebuilt': rebuilt, 'added': 0, 'changed': 0, 'removed': len(dels),
+
+                              'unchanged': len(seen) - len(puts), 'newly_dangerous': [], 'no_longer_dangerous': []}
+
+    danger_touched = False
+
+    for key in dels:
+
+        _, row = old_rows.pop(key)
+
+        if row[-1] >= threshold:
+
+            report['no_longer_dangerous'].append(row)
+
+            danger_touched = True
+
+    for key, h, row in puts:
+
+        old = previous.get(key)
+
+        report['changed' if key in old_rows else 'added'] += 1
+
+        was = old is not None and old[1][-1] >= threshold
+
+        now = row[-1] >= threshold
+
+        if now and not was and not rebuilt:
+
+            report['newly_dangerous'].append(row)
+
+        elif was and not now:
+
+            report['no_longer_dangerous'].append(old[1])
+
+        danger_touched = danger_touched or was or now
+
+        old_rows[key] = (h, row)
+
+    report['snapshot_rewritten'] = save_snapshot(bin_path, snap, puts, dels)
+
+    report['danger_lines_written'] = 0
+
+    if danger_touched or report['snapshot_rewritten'] or not danger_path.exists():
+
+        danger = sort_by_fi_desc(filter_danger([r for _, r in old_rows.values()], threshold))
+
+        report['danger_lines_written'] = patch_csv(danger_path, report['names'], danger)
+
+    report['rows'] = old_rows
+
+    return report
+
+
+def print_diff_report(report: Dict[str, Any]) -> None:
+
+    if report['rebuilt']:
+
+        print(f"[증분 갱신] 이전 형식 스냅샷 → 전체 재작성 ({report['added']}행, 변경 보고 없음)")
 
         return
 
-    headers = [k for k in rows[0].keys() if k != '_fi']
+    print(f"[증분 갱신] 추가 {report['added']} / 변경 {report['changed']} / "
 
-    print(' | '.join(headers + ['flammability']))
+          f"삭제 {report['removed']} / 유지 {report['unchanged']}")
 
-    print('-' * 80)
+    print('[새 위험 항목]')
 
-    for r in rows:
+    print_table(report['names'], sort_by_fi_desc(report['newly_dangerous']))
 
-        vals = []
+    if report['no_longer_dangerous']:
 
-        for h in headers:
+        print('[위험 해제 항목]')
 
-            v = r.get(h, '')
+        print_table(report['names'], sort_by_fi_desc(report['no_longer_dangerous']))
 
-            if isinstance(v, float):
 
-                vals.append(f'{v:.3f}')
+def print_table(names: List[str], rows: List[tuple]) -> None:
 
-            else:
+    if not rows:
 
-                vals.append(str(v))
+        print('[정보] 출력할 데이터가 없습니다.')
 
-        fi_val = r.get('_fi', r.get(fi_key, ''))
+        return
 
-        vals.append(_fmt_float(fi_val))
+    print(' | '.join(names[:-1] + ['flammability']))
+
+    print('-' * 80)
+
+    for r in rows:
+
+        vals = ['' if v is None else v for v in r[:-1]]
+
+        vals.append(f'{r[-1]:.3f}')
 
         print(' | '.join(vals))
 
@@ -183,11 +446,11 @@ def main() -> None:
 
     try:
 
-        rows, fi_key = read_inventory_csv(SRC_CSV)
+        names, rows, _ = read_inventory_csv(SRC_CSV)
 
         print('[원본 전체 출력]')
 
-        print_table(rows, fi_key)
+        print_table(names, rows)
 
     except Exception as e:
 
@@ -201,7 +464,7 @@ def main() -> None:
 
     print('\n[인화성 지수 내림차순 정렬 출력]')
 
-    print_table(sorted_rows, fi_key)
+    print_table(names, sorted_rows)
 
 
 #인화성 지수 >= 0.7 만 필터링하여 별도 출력
@@ -209,40 +472,58 @@ def main() -> None:
 
     print('\n[위험 항목(>=0.700) 출력]')
 
-    print_table(danger_rows, fi_key)
+    print_table(names, danger_rows)
 
 
 #정렬 리스트를 이진 파일(Mars_Base_Inventory_List.bin)로 저장/재로딩/출력
+#   위에서 읽은 행을 그대로 넘겨 이전 스냅샷과 행 해시로 비교, 바뀐 부분만 위험 CSV/스냅샷에 반영
 
     try:
 
-        save_csv(DANGER_CSV, danger_rows)
+        report = update_incremental(names, rows, DANGER_CSV, BIN_FILE, threshold=0.7)
 
-        print(f'\n[저장 완료] {DANGER_CSV}')
+        print(f"\n[저장 완료] {DANGER_CSV} (다시 쓴 줄 {report['danger_lines_written']})")
 
-    except Exception as e:
+        print(f"[이진 저장 완료] {BIN_FILE}{' (전체 재작성)' if report['snapshot_rewritten'] else ''}")
 
-        print(f'[오류] 위험 CSV 저장 실패: {e}')
+        print_diff_report(report)
 
+        reloaded = load_snapshot(BIN_FILE)
 
+        print('[이진 파일 재로딩 출력]')
 
-    try:
+        print_table(reloaded['header'] + ['_fi'], sort_by_fi_desc([r for _, r in reloaded['rows'].values()]))
 
-        save_binary(BIN_FILE, sorted_rows)
+    except Exception as e:
 
-        print(f'[이진 저장 완료] {BIN_FILE}')
+        print(f'[오류] 위험 CSV/이진 파일 갱신 실패: {e}')
 
-        reloaded = load_binary(BIN_FILE)
 
-        print('[이진 파일 재로딩 출력]')
+def main_incremental() -> None:
 
-        print_table(reloaded, fi_key)
+    """표 출력 없이 변경분만 반영하고 변경 보고만 출력 (python inventory_analyzer.py --incremental)"""
+
+    try:
+
+        names, rows, _ = read_inventory_csv(SRC_CSV)
+
+        report = update_incremental(names, rows, DANGER_CSV, BIN_FILE, threshold=0.7)
 
     except Exception as e:
 
-        print(f'[오류] 이진 파일 저장/로드 실패: {e}')
+        print(f'[오류] 증분 갱신 실패: {e}')
+
+        return
+
+    print_diff_report(report)
 
 
 if __name__ == '__main__':
 
-    main()
+    if '--incremental' in sys.argv[1:]:
+
+        main_incremental()
+
+    else:
+
+        main()
@@ -1,38 +1,113 @@
-import numpy as np  
-
-def main() -> None:
-    try:  
-    
-        arr1 = np.genfromtxt('mars_base_main_parts-001.csv', delimiter=',', skip_header=1, dtype=[('parts', 'U50'), ('strength', 'i4')])  
-        arr2 = np.genfromtxt('mars_base_main_parts-002.csv', delimiter=',', skip_header=1, dtype=[('parts', 'U50'), ('strength', 'i4')])  
-        arr3 = np.genfromtxt('mars_base_main_parts-003.csv', delimiter=',', skip_header=1, dtype=[('parts', 'U50'), ('strength', 'i4')])  
-    
-    except FileNotFoundError:  
-        print('파일을 찾을 수 없음.')  
-    
-    except Exception as e:  
-        print(f'Unexpected error: {e}')  
-
-    parts = np.concatenate((arr1, arr2, arr3))  
-
-    unique_parts = np.unique(parts['parts'])  #unique 중복없는값을뽑아내서 정렬
-    
-    averages = {}  
-    
-    for part in unique_parts:
-    
-        strengths = parts['strength'][parts['parts'] == part]  
-        averages[part] = np.mean(strengths)
-
-    low_avg_parts = {k: v for k, v in averages.items() if v < 50}  
+import glob
+import os
+import sys
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+PATTERN = 'mars_base_main_parts-*.csv'
+THRESHOLD = 50
+
+
+def discover(sources, pattern=PATTERN):
+    # 인자가 폴더면 그 안의 pattern 파일들, 파일이면 그대로. 인자가 없으면 현재 폴더
+    paths = []
+    for src in sources or ['.']:
+        if os.path.isdir(src):
+            paths.extend(sorted(glob.glob(os.path.join(src, pattern))))
+        else:
+            paths.append(src)
+    return list(dict.fromkeys(paths))
+
+
+def aggregate_file(path):
+    # 파일 하나 → 부품별 부분 집계 (names, count, sum, min, max)
+    # 강도를 문자열로 읽은 뒤 변환: genfromtxt는 숫자가 아닌 값을 조용히 -1로 채우기 때문
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')      # 빈 파일 경고 → 예외로 보고
+        arr = np.genfromtxt(path, delimiter=',', skip_header=1, dtype=[('parts', 'U50'), ('strength', 'U20')], ndmin=1)
+    if arr.size == 0:
+        raise ValueError('데이터 행이 없음')
+    if (np.char.strip(arr['parts']) == '').any():
+        raise ValueError('부품 이름이 빈 행이 있음')
+    strength = arr['strength'].astype(np.int64)       # 빈 값/숫자가 아니면 ValueError
+    names, inv = np.unique(arr['parts'], return_inverse=True)
+    count = np.bincount(inv, minlength=len(names))
+    total = np.bincount(inv, weights=strength, minlength=len(names))
+    lo = np.full(len(names), np.iinfo(np.int64).max)
+    hi = np.full(len(names), np.iinfo(np.int64).min)
+    np.minimum.at(lo, inv, strength)
+    np.maximum.at(hi, inv, strength)
+    return names, count, total, lo, hi
+
+
+def _safe_aggregate(path):
+    # 프로세스 풀에서 실패한 파일 하나가 전체를 멈추지 않도록 예외를 결과로 돌려줌
     try:
-        with open('parts_to_work_on.csv', 'w', encoding='utf-8') as csv_file:  
-            csv_file.write('parts,average_strength\n')  
+        return path, aggregate_file(path), None
+    except Exception as e:
+        return path, None, f'{type(e).__name__}: {e}'
+
+
+def merge(partials):
+    # 파일별 (names, count, sum, min, max)를 부품 기준으로 합침
+    if not partials:
+        return {}
+    names, inv = np.unique(np.concatenate([p[0] for p in partials]), return_inverse=True)
+    count = np.bincount(inv, weights=np.concatenate([p[1] for p in partials]), minlength=len(names)).astype(np.int64)
+    total = np.bincount(inv, weights=np.concatenate([p[2] for p in partials]), minlength=len(names))
+    lo = np.full(len(names), np.iinfo(np.int64).max)
+    hi = np.full(len(names), np.iinfo(np.int64).min)
+    np.minimum.at(lo, inv, np.concatenate([p[3] for p in partials]))
+    np.maximum.at(hi, inv, np.concatenate([p[4] for p in partials]))
+    return {str(n): {'count': int(c), 'sum': float(s), 'min': int(a), 'max': int(b), 'mean': s / c}
+            for n, c, s, a, b in zip(names, count, total, lo, hi)}
+
+
+def run_pipeline(paths, jobs=None):
+    # 반환: (부품별 집계 dict, [(실패 파일, 사유)])
+    if len(paths) <= 1 or jobs == 1:
+        results = [_safe_aggregate(p) for p in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_safe_aggregate, paths, chunksize=max(1, len(paths) // (4 * (jobs or os.cpu_count() or 1)))))
+    partials = [r for _, r, err in results if err is None]
+    failed = [(p, err) for p, _, err in results if err is not None]
+    return merge(partials), failed
+
+
+def main(argv=None) -> None:
+    import argparse
+    ap = argparse.ArgumentParser(description='부품 강도 CSV 병렬 분석 (평균 강도 < 50 부품 저장)')
+    ap.add_argument('sources', nargs='*', help=f'CSV 파일 또는 폴더 (기본: 현재 폴더의 {PATTERN})')
+    ap.add_argument('--pattern', default=PATTERN, help='폴더에서 찾을 파일 패턴')
+    ap.add_argument('--jobs', type=int, default=None, help='병렬 프로세스 수 (기본: CPU 코어 수)')
+    ap.add_argument('--out', default='parts_to_work_on.csv')
+    args = ap.parse_args(argv)
+
+    paths = discover(args.sources, args.pattern)
+    if not paths:
+        print('파일을 찾을 수 없음.')
+        return
+
+    stats, failed = run_pipeline(paths, args.jobs)
+    for path, err in failed:
+        print(f'[건너뜀] {path}: {err}')
+    print(f'분석 파일 {len(paths) - len(failed)}/{len(paths)}개, 부품 {len(stats)}종')
+    if not stats:
+        return
+
+    low_avg_parts = {k: v['mean'] for k, v in stats.items() if v['mean'] < THRESHOLD}
+    try:
+        with open(args.out, 'w', encoding='utf-8') as csv_file:
+            csv_file.write('parts,average_strength\n')
             for part, avg in low_avg_parts.items():
                 csv_file.write(f'{part},{round(avg, 3)}\n')
-    except Exception as e:  
+    except Exception as e:
         print(f'저장 실패 CSV: {e}')
 
+
 if __name__ == '__main__':
 
-    main()
\ No newline at end of file
+    main(sys.argv[1:])
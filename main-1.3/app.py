@@ -1,15 +1,23 @@
-from flask import Flask, render_template
+from flask import Flask
 import socket
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.flask_metrics import install_metrics
+from common.page_cache import PageCache
 
 app = Flask(__name__)
+metrics = install_metrics(app)
+pages = PageCache(app)
+HOSTNAME = socket.gethostname()
 
 @app.route("/")
 def home():
     if app.debug:
-        hostname = '컴퓨터(인스턴스) : ' + socket.gethostname()
+        hostname = '컴퓨터(인스턴스) : ' + HOSTNAME
     else:
         hostname = ''
-    return render_template("index.html", computername=hostname)
+    return pages.render("index.html", computername=hostname)
 
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+from typing import Iterator
+
+import numpy as np
+
+# 부하 테스트용 배치 센서 시뮬레이터
+# DummySensor.set_env는 reading 하나에 random.uniform + round를 6번 호출한다.
+# 여기서는 NumPy로 M개 센서 × N개 reading을 한 번에 컬럼(배열) 형태로 만든다.
+# 센서마다 (seed, sensor_id)로 독립 난수 생성기를 쓰므로 같은 seed면 항상 같은 결과.
+
+# (하한, 상한, 소수 자리수) — 자리수 None은 int() 절삭 (mars_mission_computer.py의 광량과 동일)
+RANGES_V1 = {      # mars_mission_computer.py DummySensor
+
+    "mars_base_internal_temperature": (18.0, 30.0, 1),
+
+    "mars_base_external_temperature": (0.0, 21.0, 1),
+
+    "mars_base_internal_humidity": (50.0, 60.0, 1),
+
+    "mars_base_external_illuminance": (500.0, 715.0, None),
+
+    "mars_base_internal_co2": (0.02, 0.10, 4),
+
+    "mars_base_internal_oxygen": (4.0, 7.0, 2),
+}
+
+RANGES_V2 = {      # mars_mission_computer2.py DummySensor
+
+    "mars_base_internal_temperature": (18.0, 26.0, 2),
+
+    "mars_base_external_temperature": (-80.0, -10.0, 2),
+
+    "mars_base_internal_humidity": (25.0, 55.0, 1),
+
+    "mars_base_external_illuminance": (0.0, 120000.0, 1),
+
+    "mars_base_internal_co2": (400.0, 1200.0, 1),
+
+    "mars_base_internal_oxygen": (19.0, 23.0, 2),
+}
+
+
+class BatchSensorSimulator:
+
+    def __init__(self, n_sensors: int, seed: int = 0, ranges: dict = RANGES_V2):
+
+        self.n_sensors = n_sensors
+
+        self.ranges = ranges
+
+        self.keys = list(ranges)
+
+        self._low = np.array([r[0] for r in ranges.values()])
+
+        self._span = np.array([r[1] - r[0] for r in ranges.values()])
+
+        self._rngs = [np.random.default_rng([seed, i]) for i in range(n_sensors)]
+
+
+    def generate(self, n_per_sensor: int, start_ts: float = 0.0, interval: float = 5.0) -> dict[str, np.ndarray]:
+
+        """센서마다 n_per_sensor개씩, 총 n_sensors * n_per_sensor개 reading을 컬럼 dict로 반환
+
+        {"sensor_id": int32[N*M], "ts": float64[N*M], "<metric>": float64[N*M], ...}
+        행 순서는 센서별로 이어져 있다 (sensor 0의 N개, sensor 1의 N개, ...).
+        """
+
+        m, n = self.n_sensors, n_per_sensor
+
+        values = np.empty((m, n, len(self.keys)))
+
+        for i, rng in enumerate(self._rngs):
+
+            values[i] = rng.random((n, len(self.keys)))
+
+        values = values.reshape(m * n, len(self.keys))
+
+        values *= self._span
+
+        values += self._low
+
+        cols: dict[str, np.ndarray] = {
+
+            "sensor_id": np.repeat(np.arange(m, dtype=np.int32), n),
+
+            "ts": np.tile(start_ts + np.arange(n) * interval, m),
+        }
+
+        for j, (k, (_, _, digits)) in enumerate(self.ranges.items()):
+
+            col = values[:, j]
+
+            cols[k] = np.floor(col) if digits is None else np.round(col, digits)
+
+        return cols
+
+
+    def stream(self, n_per_sensor: int, batches: int | None = None,
+               start_ts: float = 0.0, interval: float = 5.0) -> Iterator[dict[str, np.ndarray]]:
+
+        """generate()를 반복 호출해 시간이 이어지는 배치를 계속 흘려보낸다 (batches=None이면 무한)"""
+
+        i = 0
+
+        while batches is None or i < batches:
+
+            yield self.generate(n_per_sensor, start_ts + i * n_per_sensor * interval, interval)
+
+            i += 1
+
+
+def iter_readings(cols: dict[str, np.ndarray]) -> Iterator[tuple[int, float, dict]]:
+
+    """컬럼 배치를 MissionComputer/SensorTSDB가 받는 (sensor_id, ts, env dict) 형태로 풀어준다"""
+
+    keys = [k for k in cols if k not in ("sensor_id", "ts")]
+
+    columns = [cols[k].tolist() for k in keys]
+
+    for sid, ts, *vals in zip(cols["sensor_id"].tolist(), cols["ts"].tolist(), *columns):
+
+        yield sid, ts, dict(zip(keys, vals))
+
+
+if __name__ == "__main__":
+
+    import argparse
+
+    import time
+
+    ap = argparse.ArgumentParser(description="배치 센서 시뮬레이터 벤치마크")
+
+    ap.add_argument("--sensors", type=int, default=100, help="센서 수 M")
+
+    ap.add_argument("--readings", type=int, default=10_000, help="센서당 reading 수 N (배치 하나)")
+
+    ap.add_argument("--batches", type=int, default=10, help="배치 수")
+
+    ap.add_argument("--seed", type=int, default=0)
+
+    ap.add_argument("--v1", action="store_true", help="mars_mission_computer.py 값 범위 사용")
+
+    args = ap.parse_args()
+
+    sim = BatchSensorSimulator(args.sensors, args.seed, RANGES_V1 if args.v1 else RANGES_V2)
+
+    total = 0
+
+    t0 = time.perf_counter()
+
+    for cols in sim.stream(args.readings, args.batches):
+
+        total += len(cols["ts"])
+
+    elapsed = time.perf_counter() - t0
+
+    print(f"{total:,} readings in {elapsed:.3f}s → {total / elapsed:,.0f} readings/s")
@@ -12,6 +12,16 @@ from collections import deque
 
 from datetime import datetime, timezone
 
+from quantile_sketch import WindowQuantiles
+
+from sensor_replay import read_records
+
+from sensor_tsdb import SensorTSDB
+
+from telemetry_publisher import TelemetryPublisher
+
+from window_state import dump_window, load_window
+
 class DummySensor:
 
     def __init__(self, seed: int | None = None):    #시드를 찾을 수 없다면 시드를 만든다는 함수
@@ -44,7 +54,9 @@ class DummySensor:
 
 class MissionComputer: #설계도
 
-    def __init__(self):
+    def __init__(self, publisher: TelemetryPublisher | None = None, echo: bool = True,
+                 store: SensorTSDB | None = None, state_path: str | None = None,
+                 state_interval: float = 30.0):
 
         self.ds = DummySensor()      # 문제 3에서 제작한 DummySensor를 ds라는 이름으로 인스턴스화
 
@@ -70,6 +82,26 @@ class MissionComputer: #설계도
         self._readings = deque() 
         self._last_avg_print_ts = 0.0
 
+        self._virtual_ts: float | None = None     # replay 모드의 가상 현재 시각
+
+        # p50/p95/p99는 reading을 정렬하지 않고 30초 pane 스케치로 계산
+        self._quantiles = WindowQuantiles(
+            ["mars_base_internal_co2", "mars_base_internal_temperature", "mars_base_internal_oxygen"],
+            window_sec=self._window_sec,
+        )
+
+        self.publisher = publisher      # 로컬 구독자(UNIX 소켓/SSE)에게 발행. None이면 발행 안 함
+
+        self.echo = echo                # False면 stdout 출력 생략 (파이프가 붙어 느려지는 것 방지)
+
+        self.store = store              # 5분 윈도우를 벗어난 뒤에도 이력을 남길 시계열 저장소
+
+        self.state_path = state_path    # 윈도우 상태 스냅샷 파일. 재시작 시 복원해 5분 평균을 바로 이어감
+
+        self.state_interval = state_interval
+
+        self._last_state_save_ts = 0.0
+
 
     def stop(self): 
 
@@ -78,11 +110,18 @@ class MissionComputer: #설계도
 
     def _now_ts(self) -> float:
 
+        if self._virtual_ts is not None:      # replay 중이면 가상 시계
+
+            return self._virtual_ts
+
         return time.time()
 
 
     def _now_iso(self) -> str:
 
+        if self._virtual_ts is not None:
+
+            return datetime.fromtimestamp(self._virtual_ts, timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
 
         return datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
 
@@ -97,6 +136,49 @@ class MissionComputer: #설계도
 
             self._readings.popleft()
 
+        self._quantiles.prune(now_ts)
+
+
+    def save_state(self) -> None:
+
+        """윈도우 상태를 state_path에 저장 (임시 파일 → rename)"""
+
+        if self.state_path:
+
+            dump_window(self.state_path, self._window_sec, self._last_avg_print_ts,
+                        self._readings, list(self.env_v))
+
+
+    def restore_state(self, now_ts: float | None = None) -> int:
+
+        """저장된 윈도우 상태를 읽고 now_ts 기준 오래된 reading은 제거. 남은 reading 수 반환"""
+
+        state = load_window(self.state_path) if self.state_path else None
+
+        if state is None:
+
+            return 0
+
+        _, last_avg, readings = state
+
+        now_ts = self._now_ts() if now_ts is None else now_ts
+
+        self._readings = deque(readings)
+
+        self._last_avg_print_ts = last_avg
+
+        for ts, env in readings:        # 분위수 pane도 같은 reading으로 다시 채움
+
+            self._quantiles.add(ts, env)
+
+        self._prune_old(now_ts)
+
+        if self._readings:
+
+            self.env_v.update(self._readings[-1][1])
+
+        return len(self._readings)
+
 
     def _compute_window_averages(self) -> dict | None:
 
@@ -140,6 +222,20 @@ class MissionComputer: #설계도
 
         print(json.dumps(payload, ensure_ascii=False, indent=2)) # 데이터 직렬화
 
+    def _emit(self, kind: str, payload: dict):     # 구독자에게 발행 + (echo면) 콘솔 출력
+
+        if self.publisher is not None:
+
+            self.publisher.publish(kind, payload)
+
+        if self.echo:
+
+            if kind == "avg":
+
+                print("=== 5-minute rolling averages ===")
+
+            self._print_json(payload)
+
     def _start_input_listener(self):    #콘솔 입력을 별도 스레드에서 대기하여 정지 명령을 받으면 stop.
 
         def _listen():      #입력문자 종료
@@ -167,70 +263,147 @@ class MissionComputer: #설계도
         t.start()
 
 
-    def get_sensor_data(self, interval_seconds: int = 5):     #5초마다 센서값을 가져와 출력하는 행동 메서드
+    def _handle_reading(self, now_ts: float, latest: dict):     # reading 하나 처리 (실시간/replay 공통 경로)
 
-        self._start_input_listener()
+        # 2) env_v 갱신
+
+        self.env_v.update(latest)
+
+        # 3) 현재 스냅샷 JSON 출력 (타임스탬프 포함)
+
+        snapshot = {
+
+            "timestamp": self._now_iso(),
+
+            "env_values": dict(self.env_v)
+
+        }
+
+        self._emit("snapshot", snapshot)
+
+        # 4) 5분 윈도우에 추가 + 오래된 값 제거
+
+        self._readings.append((now_ts, dict(self.env_v)))
+
+        self._quantiles.add(now_ts, self.env_v)
+
+        self._prune_old(now_ts)
+
+        if self.store is not None:
+
+            self.store.append(now_ts, self.env_v)
+
+        # 5) 5분 평균 출력 (직전 출력 시점으로부터 300초 경과 시)
 
+        if (now_ts - self._last_avg_print_ts) >= self._window_sec:
 
-        # 초기에 한 번 바로 찍을 수도 있도록
+            avgs = self._compute_window_averages()
+
+            if avgs:
+
+                avg_payload = {
+
+                    "timestamp": self._now_iso(),
+
+                    "window_seconds": self._window_sec,
+
+                    "env_5min_avg": avgs,
+
+                    "env_5min_quantiles": self._quantiles.summary()
+
+                }
+
+                self._emit("avg", avg_payload)
+
+                self._last_avg_print_ts = now_ts
+
+        # 윈도우 상태 주기적 저장 (replay의 가상 시계에서는 저장하지 않음)
+
+        if self.state_path and self._virtual_ts is None and now_ts - self._last_state_save_ts >= self.state_interval:
+
+            self.save_state()
+
+            self._last_state_save_ts = now_ts
+
+
+    def replay(self, records) -> dict:
+
+        """기록된 (ts, env) reading들을 가상 시계로 최대한 빠르게 흘려보낸다
+
+        time.time() 대신 각 reading의 ts를 현재 시각으로 사용하므로
+        하루치 로그도 윈도우/평균 출력 경로를 그대로 타면서 몇 초 안에 검증된다.
+        """
 
         self._last_avg_print_ts = 0.0
 
-        while not self._stop_event.is_set():
+        count = 0
 
-            now_ts = self._now_ts()
+        t0 = time.perf_counter()
 
-            # 1) 센서값 읽기
+        try:
 
-            latest = self.ds.set_env()
+            for ts, env in records:
 
+                if self._stop_event.is_set():
 
-            # 2) env_v 갱신
+                    break
 
-            self.env_v.update(latest)
+                self._virtual_ts = ts
 
+                self._handle_reading(ts, env)
 
-            # 3) 현재 스냅샷 JSON 출력 (타임스탬프 포함)
+                count += 1
 
-            snapshot = {
+        finally:
 
-                "timestamp": self._now_iso(),
+            self._virtual_ts = None
 
-                "env_values": self.env_v
+        elapsed = time.perf_counter() - t0
 
-            }
+        return {
 
-            self._print_json(snapshot)
+            "readings": count,
 
-            # 4) 5분 윈도우에 추가 + 오래된 값 제거
+            "elapsed_seconds": round(elapsed, 4),
 
-            self._readings.append((now_ts, dict(self.env_v)))
+            "readings_per_sec": round(count / elapsed, 1) if elapsed > 0 else None,
+        }
 
-            self._prune_old(now_ts)
 
-            # 5) 5분 평균 출력 (직전 출력 시점으로부터 300초 경과 시)
+    def get_sensor_data(self, interval_seconds: int = 5):     #5초마다 센서값을 가져와 출력하는 행동 메서드
 
-            if (now_ts - self._last_avg_print_ts) >= self._window_sec:
+        self._start_input_listener()
 
-                avgs = self._compute_window_averages()
 
-                if avgs:
+        # 초기에 한 번 바로 찍을 수도 있도록 (저장된 윈도우 상태가 있으면 그 시점부터 이어감)
 
-                    avg_payload = {
+        self._last_avg_print_ts = 0.0
+
+        self.restore_state()
 
-                        "timestamp": self._now_iso(),
+        try:
 
-                        "window_seconds": self._window_sec,
+            self._run_loop(interval_seconds)
 
-                        "env_5min_avg": avgs
+        finally:
 
-                    }
+            self.save_state()
 
-                    print("=== 5-minute rolling averages ===")
 
-                    self._print_json(avg_payload)
+    def _run_loop(self, interval_seconds: int):
+
+        while not self._stop_event.is_set():
 
-                    self._last_avg_print_ts = now_ts
+            now_ts = self._now_ts()
+
+            # 1) 센서값 읽기
+
+            latest = self.ds.set_env()
+
+
+            # 2)~5) 갱신/출력/윈도우/평균
+
+            self._handle_reading(now_ts, latest)
 
             # 6) interval 동안 sleep 하되, 0.1초 단위로 체크하여 빠른 종료 반응성 확보
 
@@ -246,6 +419,57 @@ class MissionComputer: #설계도
 
 if __name__ == "__main__":
 
-    RunComputer = MissionComputer()
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Mars mission computer")
+
+    ap.add_argument("--socket", help="텔레메트리 UNIX 소켓 경로 (예: /tmp/mars.sock)")
+
+    ap.add_argument("--sse-port", type=int, help="SSE 포트 (GET http://127.0.0.1:<port>/events)")
+
+    ap.add_argument("--quiet", action="store_true", help="stdout JSON 출력 생략")
+
+    ap.add_argument("--store", help="센서 이력 시계열 저장소 폴더 (예: ./tsdb)")
+
+    ap.add_argument("--state", help="윈도우 상태 스냅샷 파일 (예: ./mission_window.bin). 재시작 시 복원")
+
+    ap.add_argument("--replay", help="기록된 reading 재생 (mars_env_log.csv, CSV 또는 시계열 저장소 폴더). 기본은 stdout 출력 없이 통계만")
+
+    ap.add_argument("--echo", action="store_true", help="--replay에서도 reading마다 stdout JSON 출력")
+
+    args = ap.parse_args()
+
+    publisher = None
+
+    if args.socket or args.sse_port is not None:
+
+        publisher = TelemetryPublisher(socket_path=args.socket, sse_port=args.sse_port).start()
+
+    store = SensorTSDB(args.store) if args.store else None
+
+    # replay는 처리 속도(reading/초)를 재므로 기본으로 콘솔 출력을 끔 (켜면 stdout 속도를 재게 됨)
+    echo = not args.quiet and (args.echo or not args.replay)
+
+    RunComputer = MissionComputer(publisher=publisher, echo=echo, store=store, state_path=args.state)
+
+    try:
+
+        if args.replay:
+
+            stats = RunComputer.replay(read_records(args.replay))
+
+            print(json.dumps({"replay": stats}, ensure_ascii=False))
+
+        else:
+
+            RunComputer.get_sensor_data(interval_seconds=5)
+
+    finally:
+
+        if store is not None:
+
+            store.close()
+
+        if publisher is not None:
 
-    RunComputer.get_sensor_data(interval_seconds=5)
+            publisher.stop()
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import math
+
+import random
+
+# 스트리밍 분위수(p50/p95/p99) 스케치
+# - KLLSketch : 상수 메모리(k에 비례), reading마다 O(1) amortized 갱신, 서로 merge 가능
+# - WindowQuantiles : 5분 윈도우를 pane(기본 30초) 단위 스케치로 나눠 들고 있다가
+#                     질의할 때 윈도우 안 pane들만 merge → reading을 저장/정렬하지 않음
+#   (스케치는 삭제가 안 되므로 윈도우 경계는 pane 단위로 근사된다)
+
+
+class _Compactor(list):
+
+    def compact(self, rng: random.Random) -> list:
+
+        """정렬 후 짝/홀 중 하나만 위 레벨로 올림. 홀수 개면 마지막 하나는 남겨 둔다"""
+
+        self.sort()
+
+        keep = [self.pop()] if len(self) % 2 else []
+
+        promoted = self[rng.randint(0, 1)::2]
+
+        self[:] = keep
+
+        return promoted
+
+
+class KLLSketch:
+
+    def __init__(self, k: int = 200, c: float = 2 / 3, seed: int | None = None):
+
+        self.k = k
+
+        self.c = c
+
+        self.n = 0
+
+        self.min = math.inf
+
+        self.max = -math.inf
+
+        self._rng = random.Random(seed)
+
+        self._compactors: list[_Compactor] = []
+
+        self._size = 0
+
+        self._max_size = 0
+
+        self._grow()
+
+
+    def _grow(self) -> None:
+
+        self._compactors.append(_Compactor())
+
+        self._max_size = sum(self._capacity(h) for h in range(len(self._compactors)))
+
+
+    def _capacity(self, h: int) -> int:     # 위 레벨일수록 크고, 아래 레벨은 c배씩 작아짐
+
+        depth = len(self._compactors) - h - 1
+
+        return int(math.ceil(self.k * self.c ** depth)) + 1
+
+
+    def update(self, x: float) -> None:
+
+        self.n += 1
+
+        if x < self.min:
+
+            self.min = x
+
+        if x > self.max:
+
+            self.max = x
+
+        self._compactors[0].append(x)
+
+        self._size += 1
+
+        if self._size >= self._max_size:
+
+            self._compress()
+
+
+    def _compress(self) -> None:
+
+        while self._size >= self._max_size:
+
+            for h, comp in enumerate(self._compactors):
+
+                if len(comp) >= self._capacity(h):
+
+                    if h + 1 >= len(self._compactors):
+
+                        self._grow()
+
+                    self._compactors[h + 1].extend(comp.compact(self._rng))
+
+                    break
+
+            else:
+
+                break
+
+            self._size = sum(len(comp) for comp in self._compactors)
+
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+
+        """other를 self에 합친다 (other는 변경되지 않음)"""
+
+        while len(self._compactors) < len(other._compactors):
+
+            self._grow()
+
+        for h, comp in enumerate(other._compactors):
+
+            self._compactors[h].extend(comp)
+
+        self.n += other.n
+
+        self.min = min(self.min, other.min)
+
+        self.max = max(self.max, other.max)
+
+        self._size = sum(len(comp) for comp in self._compactors)
+
+        self._compress()
+
+        return self
+
+
+    def quantile(self, q: float) -> float | None:
+
+        if self.n == 0:
+
+            return None
+
+        if q <= 0:
+
+            return self.min
+
+        if q >= 1:
+
+            return self.max
+
+        weighted = sorted((x, 1 << h) for h, comp in enumerate(self._compactors) for x in comp)
+
+        total = sum(w for _, w in weighted)
+
+        target = q * total
+
+        cum = 0
+
+        for x, w in weighted:
+
+            cum += w
+
+            if cum >= target:
+
+                return x
+
+        return self.max
+
+
+    def quantiles(self, qs: tuple[float, ...]) -> list[float | None]:
+
+        return [self.quantile(q) for q in qs]
+
+
+class WindowQuantiles:
+
+    def __init__(self, keys: list[str], window_sec: float = 300, pane_sec: float = 30, k: int = 200):
+
+        self.keys = keys
+
+        self.window_sec = window_sec
+
+        self.pane_sec = pane_sec
+
+        self.k = k
+
+        self._panes: dict[int, dict[str, KLLSketch]] = {}
+
+
+    def add(self, ts: float, env: dict) -> None:
+
+        pane = int(ts // self.pane_sec)
+
+        sketches = self._panes.get(pane)
+
+        if sketches is None:
+
+            sketches = self._panes[pane] = {k: KLLSketch(self.k) for k in self.keys}
+
+        for k in self.keys:
+
+            v = env.get(k)
+
+            if v is not None:
+
+                sketches[k].update(float(v))
+
+
+    def prune(self, now_ts: float) -> None:
+
+        oldest = int((now_ts - self.window_sec) // self.pane_sec)
+
+        for pane in [p for p in self._panes if p < oldest]:
+
+            del self._panes[pane]
+
+
+    def merged(self) -> dict[str, KLLSketch]:
+
+        out = {k: KLLSketch(self.k) for k in self.keys}
+
+        for sketches in self._panes.values():
+
+            for k, sk in sketches.items():
+
+                out[k].merge(sk)
+
+        return out
+
+
+    def summary(self, qs: tuple[float, ...] = (0.5, 0.95, 0.99)) -> dict[str, dict[str, float | None]]:
+
+        """{"mars_base_internal_co2": {"p50": .., "p95": .., "p99": ..}, ...}"""
+
+        out = {}
+
+        for k, sk in self.merged().items():
+
+            out[k] = {f"p{round(q * 100):g}": (None if v is None else round(v, 4))
+                      for q, v in zip(qs, sk.quantiles(qs))}
+
+        return out
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import csv
+
+import re
+
+from datetime import datetime
+
+from pathlib import Path
+
+from typing import Iterator
+
+# MissionComputer.replay()에 넣을 (ts, env dict) reading 읽기
+# - mars_env_log.csv : mars_mission_computer.py가 남기는 블록 형식
+#       [2025-08-08/20/25_16:36:30] 화성 기지 환경값
+#        mars_base_internal_temperature : 23.4
+#        ...
+#   (strftime의 %D가 '%m/%d/%y'라서 날짜가 'YYYY-MM-MM/DD/YY' 모양으로 찍힌다)
+# - 헤더가 있는 CSV : timestamp(epoch 초 또는 ISO) + 메트릭 컬럼
+# - SensorTSDB 폴더 : meta.json이 있는 시계열 저장소
+
+_BLOCK_HEAD = re.compile(r"^\[(?P<date>[^_\]]+)_(?P<time>\d{2}:\d{2}:\d{2})\]")
+
+
+def _parse_log_ts(date: str, clock: str) -> float | None:
+
+    if "/" in date:     # %D 로 찍힌 경우: 마지막 'MM/DD/YY' 부분만 사용
+
+        fmt, date = "%m/%d/%y", date.split("-", 2)[-1]
+
+    else:
+
+        fmt = "%Y-%m-%d"
+
+    try:
+
+        return datetime.strptime(f"{date} {clock}", f"{fmt} %H:%M:%S").timestamp()
+
+    except ValueError:
+
+        return None
+
+
+def _to_number(v: str) -> float | str:
+
+    try:
+
+        return float(v)
+
+    except ValueError:
+
+        return v
+
+
+def read_env_log(path: Path) -> Iterator[tuple[float, dict]]:
+
+    ts: float | None = None
+
+    env: dict = {}
+
+    with path.open("r", encoding="utf-8") as f:
+
+        for line in f:
+
+            m = _BLOCK_HEAD.match(line)
+
+            if m:
+
+                if ts is not None and env:
+
+                    yield ts, env
+
+                ts, env = _parse_log_ts(m["date"], m["time"]), {}
+
+            elif ":" in line and ts is not None:
+
+                k, v = line.split(":", 1)
+
+                env[k.strip()] = _to_number(v.strip())
+
+    if ts is not None and env:
+
+        yield ts, env
+
+
+def read_csv_records(path: Path) -> Iterator[tuple[float, dict]]:
+
+    with path.open("r", encoding="utf-8-sig", newline="") as f:
+
+        for row in csv.DictReader(f):
+
+            raw_ts = (row.pop("timestamp", None) or row.pop("ts", None) or "").strip()
+
+            try:
+
+                ts = float(raw_ts)
+
+            except ValueError:
+
+                try:
+
+                    ts = datetime.fromisoformat(raw_ts.replace("Z", "+00:00")).timestamp()
+
+                except ValueError:
+
+                    continue
+
+            yield ts, {k.strip(): _to_number(v.strip()) for k, v in row.items() if k}
+
+
+def read_records(source: str | Path) -> Iterator[tuple[float, dict]]:
+
+    path = Path(source)
+
+    if path.is_dir():
+
+        from sensor_tsdb import SensorTSDB
+
+        yield from SensorTSDB(path).query(0.0, 1e15)     # 전체 구간
+
+        return
+
+    with path.open("r", encoding="utf-8-sig") as f:
+
+        first = f.readline()
+
+    if first.startswith("["):
+
+        yield from read_env_log(path)
+
+    else:
+
+        yield from read_csv_records(path)
@@ -0,0 +1,366 @@
+from __future__ import annotations
+
+import json
+
+import struct
+
+from pathlib import Path
+
+from typing import Iterator
+
+# 센서 이력을 오래 보관하기 위한 append-only 시계열 저장소
+#
+#   <root>/meta.json              : 메트릭 목록, 스케일, 세그먼트 길이
+#   <root>/seg_<start>.tsd        : 블록(block)들이 이어 붙는 데이터 파일
+#   <root>/seg_<start>.idx        : 블록마다 (최소 ts, 최대 ts, 개수, offset, 길이) 고정 크기 인덱스
+#
+# 블록 하나 = reading 최대 block_size개. 타임스탬프(ms)와 각 메트릭(정수로 스케일)을
+# 컬럼별로 delta + zigzag varint로 인코딩한다. 센서값은 천천히 변하므로 대부분 1~2바이트.
+# 질의는 세그먼트 이름과 .idx만 보고 겹치지 않는 세그먼트/블록은 아예 읽지 않는다.
+
+DEFAULT_METRICS = (
+
+    "mars_base_internal_temperature",
+
+    "mars_base_external_temperature",
+
+    "mars_base_internal_humidity",
+
+    "mars_base_external_illuminance",
+
+    "mars_base_internal_co2",
+
+    "mars_base_internal_oxygen",
+)
+
+_INDEX = struct.Struct("<qqIQI")     # min_ts_ms, max_ts_ms, count, offset, length
+
+
+def _zigzag(n: int) -> int:
+
+    return (n << 1) ^ (n >> 63)
+
+
+def _unzigzag(n: int) -> int:
+
+    return (n >> 1) ^ -(n & 1)
+
+
+def _put_varint(out: bytearray, n: int) -> None:
+
+    while n >= 0x80:
+
+        out.append((n & 0x7F) | 0x80)
+
+        n >>= 7
+
+    out.append(n)
+
+
+def _encode_column(out: bytearray, values: list[int]) -> None:
+
+    prev = 0
+
+    for v in values:
+
+        _put_varint(out, _zigzag(v - prev))
+
+        prev = v
+
+
+def _decode_columns(buf: bytes, count: int, ncols: int) -> list[list[int]]:
+
+    cols: list[list[int]] = []
+
+    pos = 0
+
+    for _ in range(ncols):
+
+        col = []
+
+        prev = 0
+
+        for _ in range(count):
+
+            shift = 0
+
+            n = 0
+
+            while True:
+
+                b = buf[pos]
+
+                pos += 1
+
+                n |= (b & 0x7F) << shift
+
+                if b < 0x80:
+
+                    break
+
+                shift += 7
+
+            prev += _unzigzag(n)
+
+            col.append(prev)
+
+        cols.append(col)
+
+    return cols
+
+
+class SensorTSDB:
+
+    def __init__(self, root: str | Path, metrics: tuple[str, ...] = DEFAULT_METRICS,
+                 scale: int = 10_000, block_size: int = 256, segment_sec: int = 86_400):
+
+        self.root = Path(root)
+
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        meta_path = self.root / "meta.json"
+
+        if meta_path.exists():      # 이미 만들어진 저장소면 저장된 스키마를 그대로 따른다
+
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+
+            metrics, scale, segment_sec = tuple(meta["metrics"]), meta["scale"], meta["segment_sec"]
+
+        else:
+
+            meta_path.write_text(json.dumps({"metrics": list(metrics), "scale": scale,
+                                             "segment_sec": segment_sec}), encoding="utf-8")
+
+        self.metrics = metrics
+
+        self.scale = scale
+
+        self.block_size = block_size
+
+        self.segment_sec = segment_sec
+
+        self._buf: list[tuple[int, list[int]]] = []     # 아직 디스크에 안 쓴 (ts_ms, 스케일된 값들)
+
+        self._buf_segment: int | None = None
+
+
+    # ------------------------------------------------------------------ 쓰기
+
+    def _segment_of(self, ts_ms: int) -> int:
+
+        return ts_ms // 1000 // self.segment_sec * self.segment_sec
+
+
+    def append(self, ts: float, env: dict) -> None:
+
+        ts_ms = int(round(ts * 1000))
+
+        seg = self._segment_of(ts_ms)
+
+        if self._buf and seg != self._buf_segment:     # 블록이 세그먼트 경계를 넘지 않도록
+
+            self.flush()
+
+        self._buf_segment = seg
+
+        self._buf.append((ts_ms, [int(round(float(env.get(k) or 0.0) * self.scale)) for k in self.metrics]))
+
+        if len(self._buf) >= self.block_size:
+
+            self.flush()
+
+
+    def flush(self) -> None:
+
+        if not self._buf:
+
+            return
+
+        rows, seg = self._buf, self._buf_segment
+
+        self._buf = []
+
+        payload = bytearray()
+
+        _encode_column(payload, [ts for ts, _ in rows])
+
+        for i in range(len(self.metrics)):
+
+            _encode_column(payload, [vals[i] for _, vals in rows])
+
+        data_path = self.root / f"seg_{seg}.tsd"
+
+        with data_path.open("ab") as f:
+
+            offset = f.tell()
+
+            f.write(payload)
+
+        # 데이터를 먼저 쓰고 인덱스를 나중에 쓴다: 중간에 죽어도 인덱스에 없는 바이트는 무시됨
+        # 인덱스 엔트리를 쓰다 죽었으면 잘린 엔트리가 남으므로, 붙이기 전에 엔트리 크기의 배수로 잘라낸다
+        # (그대로 두면 뒤에 붙는 엔트리가 모두 어긋나 세그먼트 전체를 못 읽게 됨)
+        tss = [ts for ts, _ in rows]
+
+        with (self.root / f"seg_{seg}.idx").open("ab") as f:
+
+            torn = f.tell() % _INDEX.size
+
+            if torn:
+
+                f.truncate(f.tell() - torn)
+
+            f.write(_INDEX.pack(min(tss), max(tss), len(rows), offset, len(payload)))
+
+
+    def close(self) -> None:
+
+        self.flush()
+
+
+    # ------------------------------------------------------------------ 읽기
+
+    def _segments(self, start_ms: int, end_ms: int) -> list[int]:
+
+        segs = []
+
+        for p in self.root.glob("seg_*.idx"):
+
+            seg = int(p.stem[4:])
+
+            if seg * 1000 <= end_ms and (seg + self.segment_sec) * 1000 > start_ms:
+
+                segs.append(seg)
+
+        return sorted(segs)
+
+
+    def _read_index(self, seg: int) -> list[tuple[int, int, int, int, int]]:
+
+        raw = (self.root / f"seg_{seg}.idx").read_bytes()
+
+        usable = len(raw) - len(raw) % _INDEX.size     # 잘린 마지막 엔트리는 버림
+
+        data_path = self.root / f"seg_{seg}.tsd"
+
+        size = data_path.stat().st_size if data_path.exists() else 0
+
+        entries = (_INDEX.unpack_from(raw, off) for off in range(0, usable, _INDEX.size))
+
+        return [e for e in entries if e[3] + e[4] <= size]      # 데이터 파일 끝을 넘는 블록(디스크에 다 안 써진 것)은 버림
+
+
+    def query(self, start: float, end: float) -> Iterator[tuple[float, dict]]:
+
+        """[start, end] 구간의 reading을 (ts, env dict)로 순서대로 돌려준다"""
+
+        start_ms, end_ms = int(start * 1000), int(end * 1000)
+
+        for seg in self._segments(start_ms, end_ms):
+
+            entries = [e for e in self._read_index(seg) if e[0] <= end_ms and e[1] >= start_ms]
+
+            if not entries:
+
+                continue
+
+            with (self.root / f"seg_{seg}.tsd").open("rb") as f:
+
+                for _, _, count, offset, length in entries:
+
+                    f.seek(offset)
+
+                    cols = _decode_columns(f.read(length), count, len(self.metrics) + 1)
+
+                    yield from self._rows(cols[0], list(zip(*cols[1:])), start_ms, end_ms)
+
+        if self._buf:       # 아직 flush 안 된 최신 데이터도 질의 결과에 포함
+
+            yield from self._rows([ts for ts, _ in self._buf], [vals for _, vals in self._buf], start_ms, end_ms)
+
+
+    def _rows(self, tss, valss, start_ms: int, end_ms: int) -> Iterator[tuple[float, dict]]:
+
+        scale = self.scale
+
+        for ts_ms, vals in zip(tss, valss):
+
+            if start_ms <= ts_ms <= end_ms:
+
+                yield ts_ms / 1000, {k: v / scale for k, v in zip(self.metrics, vals)}
+
+
+    def downsample(self, start: float, end: float, bucket_sec: float) -> list[dict]:
+
+        """bucket_sec 단위 평균. 예) downsample(day_start, day_end, 60) → 1분 평균 1440개"""
+
+        buckets: dict[int, list] = {}
+
+        for ts, env in self.query(start, end):
+
+            b = int((ts - start) // bucket_sec)
+
+            acc = buckets.get(b)
+
+            if acc is None:
+
+                acc = buckets[b] = [0, {k: 0.0 for k in self.metrics}]
+
+            acc[0] += 1
+
+            sums = acc[1]
+
+            for k, v in env.items():
+
+                sums[k] += v
+
+        out = []
+
+        for b in sorted(buckets):
+
+            cnt, sums = buckets[b]
+
+            out.append({
+
+                "bucket_start": start + b * bucket_sec,
+
+                "count": cnt,
+
+                "mean": {k: round(s / cnt, 4) for k, s in sums.items()},
+            })
+
+        return out
+
+
+if __name__ == "__main__":
+
+    import argparse
+
+    import time
+
+    ap = argparse.ArgumentParser(description="센서 시계열 저장소 조회")
+
+    ap.add_argument("root", help="저장소 폴더")
+
+    ap.add_argument("--start", type=float, default=0.0, help="시작 epoch 초 (기본: 처음부터)")
+
+    ap.add_argument("--end", type=float, default=None, help="끝 epoch 초 (기본: 현재)")
+
+    ap.add_argument("--bucket", type=float, default=0.0, help="다운샘플 간격(초). 0이면 원본 reading 출력")
+
+    args = ap.parse_args()
+
+    db = SensorTSDB(args.root)
+
+    end = args.end if args.end is not None else time.time()
+
+    if args.bucket > 0:
+
+        for row in db.downsample(args.start, end, args.bucket):
+
+            print(json.dumps(row, ensure_ascii=False, separators=(",", ":")))
+
+    else:
+
+        for ts, env in db.query(args.start, end):
+
+            print(json.dumps({"ts": ts, "env": env}, ensure_ascii=False, separators=(",", ":")))
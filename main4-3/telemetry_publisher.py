@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+import json
+
+import os
+
+import socketserver
+
+import threading
+
+import time
+
+from collections import deque
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# MissionComputer 스냅샷/평균을 로컬 구독자에게 발행하는 퍼블리셔
+# - 직렬화는 한 번만(compact JSON) 하고 모든 구독자가 같은 bytes를 공유
+# - 여러 reading을 하나의 frame으로 묶어서(batch) 전송
+# - 느린 구독자는 큐(maxlen)가 차면 가장 오래된 frame부터 버림 → 샘플링 루프는 절대 막히지 않음
+
+
+class _Subscriber:
+
+    def __init__(self, max_frames: int):
+
+        self.frames: deque = deque(maxlen=max_frames)
+
+        self.dropped = 0
+
+        self.closed = False
+
+        self._cond = threading.Condition()
+
+
+    def push(self, frame: bytes) -> None:
+
+        with self._cond:
+
+            if len(self.frames) == self.frames.maxlen:
+
+                self.dropped += 1     # 가득 찼으면 append가 맨 앞(가장 오래된) frame을 밀어냄
+
+            self.frames.append(frame)
+
+            self._cond.notify()
+
+
+    def drain(self, timeout: float) -> list[bytes]:
+
+        with self._cond:
+
+            if not self.frames and not self.closed:
+
+                self._cond.wait(timeout)
+
+            out = list(self.frames)
+
+            self.frames.clear()
+
+            return out
+
+
+    def close(self) -> None:
+
+        with self._cond:
+
+            self.closed = True
+
+            self._cond.notify_all()
+
+
+class TelemetryPublisher:
+
+    def __init__(self, socket_path: str | None = None, sse_port: int | None = None,
+                 batch_size: int = 10, flush_interval: float = 1.0, max_queue: int = 256):
+
+        self.socket_path = socket_path
+
+        self.sse_port = sse_port
+
+        self.batch_size = batch_size
+
+        self.flush_interval = flush_interval
+
+        self.max_queue = max_queue
+
+        self._pending: list[dict] = []
+
+        self._last_flush = time.monotonic()
+
+        self._lock = threading.Lock()
+
+        self._subs: set[_Subscriber] = set()
+
+        self._servers: list = []
+
+        self._stop_event = threading.Event()
+
+
+    # ------------------------------------------------------------------ 발행
+
+    def publish(self, kind: str, payload: dict) -> None:
+
+        """샘플링 루프에서 호출. 리스트에 넣기만 하고 batch가 차면 flush"""
+
+        with self._lock:
+
+            self._pending.append({"type": kind, "data": payload})
+
+            if len(self._pending) < self.batch_size:
+
+                return
+
+            batch = self._take_pending()
+
+        self._broadcast(batch)
+
+
+    def flush(self) -> None:
+
+        with self._lock:
+
+            batch = self._take_pending()
+
+        self._broadcast(batch)
+
+
+    def _take_pending(self) -> list[dict]:
+
+        batch, self._pending = self._pending, []
+
+        self._last_flush = time.monotonic()
+
+        return batch
+
+
+    def _broadcast(self, batch: list[dict]) -> None:
+
+        if not batch:
+
+            return
+
+        # ensure_ascii=False + 공백 없는 구분자 → indent=2 대비 훨씬 작고 빠름
+        frame = json.dumps(batch, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+        with self._lock:
+
+            subs = list(self._subs)
+
+        for sub in subs:
+
+            sub.push(frame)
+
+
+    def _flush_loop(self) -> None:     # batch가 덜 찼어도 flush_interval마다 내보내기
+
+        while not self._stop_event.wait(self.flush_interval / 2):
+
+            with self._lock:
+
+                due = self._pending and time.monotonic() - self._last_flush >= self.flush_interval
+
+                batch = self._take_pending() if due else []
+
+            self._broadcast(batch)
+
+
+    # ------------------------------------------------------------------ 구독
+
+    def subscribe(self) -> _Subscriber:
+
+        sub = _Subscriber(self.max_queue)
+
+        with self._lock:
+
+            self._subs.add(sub)
+
+        return sub
+
+
+    def unsubscribe(self, sub: _Subscriber) -> None:
+
+        with self._lock:
+
+            self._subs.discard(sub)
+
+        sub.close()
+
+
+    def _serve_subscriber(self, write, prefix: bytes, suffix: bytes) -> None:
+
+        """구독자 하나를 담당하는 스레드 본체. write가 실패하면(연결 끊김) 종료"""
+
+        sub = self.subscribe()
+
+        try:
+
+            while not self._stop_event.is_set() and not sub.closed:
+
+                frames = sub.drain(timeout=1.0)
+
+                if frames:
+
+                    write(b"".join(prefix + f + suffix for f in frames))
+
+        except (BrokenPipeError, ConnectionResetError, OSError):
+
+            pass
+
+        finally:
+
+            self.unsubscribe(sub)
+
+
+    # ------------------------------------------------------------------ 서버
+
+    def start(self) -> "TelemetryPublisher":
+
+        publisher = self
+
+        if self.socket_path:
+
+            class _UnixHandler(socketserver.StreamRequestHandler):     # 한 줄 = 한 frame (NDJSON)
+
+                def handle(self):
+
+                    def _write(data: bytes):
+
+                        self.wfile.write(data)
+
+                        self.wfile.flush()
+
+                    publisher._serve_subscriber(_write, b"", b"\n")
+
+            if os.path.exists(self.socket_path):
+
+                os.unlink(self.socket_path)
+
+            server = socketserver.ThreadingUnixStreamServer(self.socket_path, _UnixHandler)
+
+            server.daemon_threads = True
+
+            self._servers.append(server)
+
+        if self.sse_port is not None:
+
+            class _SSEHandler(BaseHTTPRequestHandler):     # GET /events → text/event-stream
+
+                def do_GET(self):
+
+                    if self.path.split("?")[0] != "/events":
+
+                        self.send_error(404)
+
+                        return
+
+                    self.send_response(200)
+
+                    self.send_header("Content-Type", "text/event-stream")
+
+                    self.send_header("Cache-Control", "no-cache")
+
+                    self.end_headers()
+
+                    def _write(data: bytes):
+
+                        self.wfile.write(data)
+
+                        self.wfile.flush()
+
+                    publisher._serve_subscriber(_write, b"data: ", b"\n\n")
+
+                def log_message(self, format, *args):     # 요청 로그로 stdout을 더럽히지 않기
+
+                    pass
+
+            server = ThreadingHTTPServer(("127.0.0.1", self.sse_port), _SSEHandler)
+
+            server.daemon_threads = True
+
+            self._servers.append(server)
+
+        for server in self._servers:
+
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        threading.Thread(target=self._flush_loop, daemon=True).start()
+
+        return self
+
+
+    def stop(self) -> None:
+
+        self.flush()
+
+        self._stop_event.set()
+
+        with self._lock:
+
+            subs = list(self._subs)
+
+        for sub in subs:
+
+            sub.close()
+
+        for server in self._servers:
+
+            server.shutdown()
+
+            server.server_close()
+
+        if self.socket_path and os.path.exists(self.socket_path):
+
+            os.unlink(self.socket_path)
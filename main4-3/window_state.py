@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import math
+
+import os
+
+import struct
+
+from pathlib import Path
+
+# MissionComputer 5분 윈도우 상태(_readings, _last_avg_print_ts)의 작은 이진 스냅샷
+#   헤더  <4sBddHI : magic, 버전, window_sec, last_avg_print_ts, 키 개수, reading 개수
+#   키    (<H 길이 + utf-8 이름) × 키 개수
+#   값    <d × reading 개수 × (1 + 키 개수) : ts, 값들 (None은 NaN)
+# 임시 파일에 쓰고 fsync 후 rename 하므로 중간에 죽어도 이전 스냅샷이 그대로 남는다.
+
+MAGIC = b"MCWS"
+
+VERSION = 1
+
+_HEADER = struct.Struct("<4sBddHI")
+
+_KEY_LEN = struct.Struct("<H")
+
+
+def dump_window(path: str | Path, window_sec: float, last_avg_print_ts: float,
+                readings, keys: list[str]) -> None:
+
+    path = Path(path)
+
+    readings = list(readings)
+
+    out = bytearray(_HEADER.pack(MAGIC, VERSION, window_sec, last_avg_print_ts, len(keys), len(readings)))
+
+    for key in keys:
+
+        name = key.encode("utf-8")
+
+        out += _KEY_LEN.pack(len(name)) + name
+
+    flat: list[float] = []
+
+    for ts, env in readings:
+
+        flat.append(ts)
+
+        flat.extend(math.nan if env.get(k) is None else float(env[k]) for k in keys)
+
+    out += struct.pack(f"<{len(flat)}d", *flat)
+
+    tmp = path.with_name(path.name + ".tmp")
+
+    with tmp.open("wb") as f:
+
+        f.write(out)
+
+        f.flush()
+
+        os.fsync(f.fileno())
+
+    os.replace(tmp, path)
+
+
+def load_window(path: str | Path) -> tuple[float, float, list[tuple[float, dict]]] | None:
+
+    """(window_sec, last_avg_print_ts, [(ts, env), ...]) — 파일이 없거나 형식이 다르면 None"""
+
+    try:
+
+        data = Path(path).read_bytes()
+
+    except FileNotFoundError:
+
+        return None
+
+    if len(data) < _HEADER.size:
+
+        return None
+
+    magic, version, window_sec, last_avg, nkeys, count = _HEADER.unpack_from(data)
+
+    if magic != MAGIC or version != VERSION:
+
+        return None
+
+    pos = _HEADER.size
+
+    keys = []
+
+    try:
+
+        for _ in range(nkeys):       # 잘린 파일: 길이/이름이 끝을 넘으면 형식이 다른 것으로 처리
+
+            if pos + _KEY_LEN.size > len(data):
+
+                return None
+
+            (n,) = _KEY_LEN.unpack_from(data, pos)
+
+            pos += _KEY_LEN.size
+
+            if pos + n > len(data):
+
+                return None
+
+            keys.append(data[pos:pos + n].decode("utf-8"))
+
+            pos += n
+
+        width = 1 + nkeys
+
+        if len(data) - pos != 8 * width * count:
+
+            return None
+
+        flat = struct.unpack_from(f"<{width * count}d", data, pos)
+
+    except (struct.error, UnicodeDecodeError):
+
+        return None
+
+    readings = []
+
+    for i in range(0, len(flat), width):
+
+        env = {k: (None if math.isnan(v) else v) for k, v in zip(keys, flat[i + 1:i + width])}
+
+        readings.append((flat[i], env))
+
+    return window_sec, last_avg, readings